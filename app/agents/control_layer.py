@@ -8,9 +8,17 @@ Provides:
 4. Backward compatibility with existing checks
 """
 
-from typing import Set, Dict, Any, Optional
+from typing import Set, Tuple, Dict, Any, Optional
 from enum import Enum
 import json
+import re
+
+
+# Success markers in plain-text tool results (case-insensitive, one scan)
+_SUCCESS_MARKER_RE = re.compile(r"success|✓|✅", re.IGNORECASE)
+
+# Wrapped (JSON object) results start with '{'; anything else skips json.loads
+_JSON_OBJECT_START_RE = re.compile(r"\s*\{")
 
 
 class TerminationReason(Enum):
@@ -47,6 +55,21 @@ class ControlLayerConfig:
     # Loop detection threshold
     MAX_SAME_TOOL_CALLS = 3
 
+    # Substrings (case-insensitive) that mark a tool result as an error
+    ERROR_INDICATORS: Tuple[str, ...] = (
+        "不可用", "unavailable", "error", "failed", "失败",
+        "当前状态", "当前可用工具", "请使用", "not allowed"
+    )
+
+
+def _compile_error_scanner(indicators: Tuple[str, ...]) -> "re.Pattern[str]":
+    """All error indicators in one alternation: a single scan per result"""
+    return re.compile("|".join(map(re.escape, indicators)), re.IGNORECASE)
+
+
+# Scanner for the default indicators, shared by every ControlLayer
+_DEFAULT_ERROR_SCANNER = _compile_error_scanner(ControlLayerConfig.ERROR_INDICATORS)
+
 
 class LoopState:
     """Track execution state for loop detection"""
@@ -54,13 +77,26 @@ class LoopState:
     def __init__(self):
         self.turn_count = 0
         self.tools_called_in_session = []
-        self.tool_call_signatures = []
-        self.last_tool_call_signature = ""
+        self.tool_call_count = 0
+        self.last_tool_call_signature: Optional[int] = None
         self.consecutive_same_tool_calls = 0
 
+    @staticmethod
+    def tool_call_signature(tool_name: str, tool_args: Dict[str, Any]) -> int:
+        """
+        Cheap structural hash of a tool call for equality checks.
+
+        Flat argument dicts are hashed directly; JSON serialization is only
+        used as a fallback when an argument value is unhashable.
+        """
+        try:
+            return hash((tool_name, tuple(sorted(tool_args.items()))))
+        except (TypeError, AttributeError):
+            return hash((tool_name, json.dumps(tool_args, sort_keys=True, default=str)))
+
     def record_tool_call(self, tool_name: str, tool_args: Dict[str, Any]):
         """Record a tool call for loop detection"""
-        signature = f"{tool_name}:{json.dumps(tool_args, sort_keys=True)}"
+        signature = self.tool_call_signature(tool_name, tool_args)
 
         if signature == self.last_tool_call_signature:
             self.consecutive_same_tool_calls += 1
@@ -68,8 +104,8 @@ class LoopState:
             self.consecutive_same_tool_calls = 0
 
         self.last_tool_call_signature = signature
-        self.tool_call_signatures.append(signature)
         self.tools_called_in_session.append(tool_name)
+        self.tool_call_count += 1
 
 
 class ControlLayer:
@@ -78,6 +114,12 @@ class ControlLayer:
     def __init__(self, config: Optional[ControlLayerConfig] = None):
         self.config = config or ControlLayerConfig()
         self.state = LoopState()
+        # Compiled per instance only when the config overrides the indicators
+        indicators = self.config.ERROR_INDICATORS
+        if indicators is ControlLayerConfig.ERROR_INDICATORS:
+            self._error_scanner = _DEFAULT_ERROR_SCANNER
+        else:
+            self._error_scanner = _compile_error_scanner(indicators)
 
     def should_terminate_after_tool(
         self,
@@ -127,7 +169,7 @@ class ControlLayer:
             )
 
         # Check 4: Tool call limit
-        if len(self.state.tools_called_in_session) >= self.config.MAX_TOOL_CALLS_TOTAL:
+        if self.state.tool_call_count >= self.config.MAX_TOOL_CALLS_TOTAL:
             return True, TerminationReason.TOOL_CALL_LIMIT_REACHED, (
                 f"⚠️ Reached maximum tool calls ({self.config.MAX_TOOL_CALLS_TOTAL}). "
                 f"Please confirm before continuing."
@@ -139,14 +181,15 @@ class ControlLayer:
         """Check if tool result indicates success"""
         if isinstance(result, str):
             # Check for wrapped result format
-            try:
-                parsed = json.loads(result)
-                if isinstance(parsed, dict):
-                    return parsed.get("status") == "success"
-            except json.JSONDecodeError:
-                pass
+            if _JSON_OBJECT_START_RE.match(result):
+                try:
+                    parsed = json.loads(result)
+                    if isinstance(parsed, dict):
+                        return parsed.get("status") == "success"
+                except json.JSONDecodeError:
+                    pass
             # Check for success indicators in string
-            return "success" in result.lower() or "✓" in result or "✅" in result
+            return _SUCCESS_MARKER_RE.search(result) is not None
 
         if isinstance(result, dict):
             return result.get("status") == "success"
@@ -155,32 +198,24 @@ class ControlLayer:
 
     def _is_error_result(self, result: Any) -> bool:
         """Check if tool result indicates an error or unavailability"""
-        error_indicators = [
-            "不可用", "unavailable", "error", "failed", "失败",
-            "当前状态", "当前可用工具", "请使用", "not allowed"
-        ]
-        
         if isinstance(result, str):
-            result_lower = result.lower()
             # Check for error indicators
-            for indicator in error_indicators:
-                if indicator.lower() in result_lower:
-                    return True
+            if self._error_scanner.search(result):
+                return True
             
             # Check for wrapped result format
-            try:
-                parsed = json.loads(result)
-                if isinstance(parsed, dict):
-                    status = parsed.get("status", "")
-                    message = parsed.get("message", "")
-                    # If status is success but message contains error indicators
-                    if status == "success":
-                        for indicator in error_indicators:
-                            if indicator.lower() in message.lower():
-                                return True
-                    return status in ["error", "failed", "unavailable"]
-            except json.JSONDecodeError:
-                pass
+            if _JSON_OBJECT_START_RE.match(result):
+                try:
+                    parsed = json.loads(result)
+                    if isinstance(parsed, dict):
+                        status = parsed.get("status", "")
+                        message = parsed.get("message", "")
+                        # If status is success but message contains error indicators
+                        if status == "success" and self._error_scanner.search(message):
+                            return True
+                        return status in ["error", "failed", "unavailable"]
+                except json.JSONDecodeError:
+                    pass
 
         if isinstance(result, dict):
             status = result.get("status", "")
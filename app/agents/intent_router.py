@@ -0,0 +1,84 @@
+"""
+Intent Router - Fast path for unambiguous tool commands
+
+Provides:
+1. Anchored whole-message patterns for common device commands
+2. Direct tool dispatch without an LLM round-trip
+3. Templated responses built from the tool result
+4. Activation limited to tools that are actually registered
+
+Only messages that match a pattern in full are routed; anything else
+(questions, compound requests, extra words) goes through the agent loop.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# (pattern, tool name, builder of tool arguments from the match, response
+# template formatted with the tool result as {result} and the arguments)
+IntentRule = Tuple[re.Pattern, str, Callable[[re.Match], Dict[str, Any]], str]
+
+_LASER = r"(?:飞秒)?激光(?:器)?"
+
+DEFAULT_RULES: List[IntentRule] = [
+    (
+        re.compile(rf"(?:请)?(?:打开|开启){_LASER}|(?:turn|switch) (?:the )?laser on|laser on", re.IGNORECASE),
+        "mock_laser_control",
+        lambda m: {"command": "on"},
+        "✓ 已执行: 打开激光器\n\n{result}",
+    ),
+    (
+        re.compile(rf"(?:请)?(?:关闭|关掉){_LASER}|(?:turn|switch) (?:the )?laser off|laser off", re.IGNORECASE),
+        "mock_laser_control",
+        lambda m: {"command": "off"},
+        "✓ 已执行: 关闭激光器\n\n{result}",
+    ),
+    (
+        re.compile(
+            rf"(?:请)?(?:把|将)?(?:{_LASER})?功率(?:设置|设|调节|调)(?:为|到|至)?\s*(\d+)\s*(?:mw)?"
+            r"|set (?:the )?laser power to (\d+)\s*(?:mw)?",
+            re.IGNORECASE,
+        ),
+        "mock_laser_control",
+        lambda m: {"command": "set_power", "value": int(m.group(1) or m.group(2))},
+        "✓ 已执行: 激光功率设置为 {value} mW\n\n{result}",
+    ),
+]
+
+# Trailing punctuation ignored when matching
+_TRAILING_PUNCT = " \t\r\n。.!！?？"
+
+
+class IntentRouter:
+    """Match whole messages against compiled intent rules."""
+
+    def __init__(self, tool_names: Iterable[str], rules: Optional[List[IntentRule]] = None):
+        """
+        Args:
+            tool_names: Names of the registered tools; rules for other
+                tools are dropped
+            rules: Intent rules (defaults to DEFAULT_RULES)
+        """
+        available = set(tool_names)
+        self.rules = [rule for rule in (rules or DEFAULT_RULES) if rule[1] in available]
+
+    def match(self, message: str) -> Optional[Tuple[str, Dict[str, Any], str]]:
+        """
+        Route a message to a tool call.
+
+        Returns:
+            (tool_name, arguments, response_template) if exactly one rule
+            matches the whole message, None otherwise
+        """
+        if not self.rules:
+            return None
+
+        text = message.strip().rstrip(_TRAILING_PUNCT)
+        hits = []
+        for pattern, tool_name, build_args, template in self.rules:
+            m = pattern.fullmatch(text)
+            if m:
+                hits.append((tool_name, build_args(m), template))
+
+        return hits[0] if len(hits) == 1 else None
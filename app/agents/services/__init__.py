@@ -4,6 +4,7 @@ Agent Services Package
 Provides:
 - AgentService: Core agent logic with OpenAI API
 - SessionManager: Per-session state management
+- ResponseCache: Cache for repeated stateless responses
 """
 
 from app.agents.services.agent_service import AgentService, get_agent_service
@@ -12,6 +13,7 @@ from app.agents.services.session_manager import (
     SessionManager,
     get_session_manager,
 )
+from app.agents.services.response_cache import ResponseCache
 
 __all__ = [
     "AgentService",
@@ -19,4 +21,5 @@ __all__ = [
     "Session",
     "SessionManager",
     "get_session_manager",
+    "ResponseCache",
 ]
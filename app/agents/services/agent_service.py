@@ -2,7 +2,7 @@
 Agent Service - Native OpenAI API Implementation with Session Support
 
 This module implements the core agent loop using:
-1. Native OpenAI SDK for API calls
+1. Native async OpenAI SDK for API calls
 2. OpenAI Function Calling for tool execution
 3. ControlLayer for loop termination and safety checks
 4. Session-based state management (no global singleton)
@@ -11,15 +11,53 @@ This module implements the core agent loop using:
 No qwen-agent dependency - pure OpenAI compatible implementation.
 """
 import asyncio
+import atexit
+import hashlib
 import json
-from typing import List, Dict, Any, Optional
+import logging
+import re
+import secrets
+import threading
+from concurrent.futures import Future
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Callable, Awaitable, AsyncIterator
 
-from openai import OpenAI
+# openai is imported on first use (it costs ~0.4s at import time), so
+# processes that only touch sessions or config don't pay for it
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from openai.types.chat import ChatCompletionMessage
 
 from app.config.settings import config
 from app.agents.control_layer import ControlLayer, ControlLayerConfig, TerminationReason
+from app.agents.intent_router import IntentRouter
 from app.agents.services.session_manager import Session, SessionManager, get_session_manager
+from app.agents.services.response_cache import ResponseCache
+from app.tools import initialize_tools_async, get_openai_tools, call_tool, registry
 
+# orjson is optional: faster parsing of tool-call arguments when installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch
+# the stdlib exception either way.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# Response cleanup patterns (compiled once at import)
+_THINK_OPEN = '<think>'
+_THINK_CLOSE = '</think>'
+_THINK_BLOCK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+_THINK_TAIL_RE = re.compile(r'<think>.*$', re.DOTALL)
+_TOOL_CALL_OPEN = '<tool_call>'
+_TOOL_CALL_RE = re.compile(r'<tool_call>.*?</tool_call>', re.DOTALL)
+_EXTRA_NEWLINES_RE = re.compile(r'\n{3,}')
+
+# Tool result recorded for calls interrupted by a client disconnect
+_TOOL_CALL_CANCELLED = "Tool call cancelled: the request was aborted before it finished."
+
+logger = logging.getLogger(__name__)
 
 class AgentService:
     """
@@ -38,61 +76,135 @@ class AgentService:
 
     def __init__(self):
         """Initialize the agent service with LLM configuration."""
-        self._client: Optional[OpenAI] = None
+        self._client: Optional["AsyncOpenAI"] = None
         self._tools: List[Dict[str, Any]] = []  # OpenAI tools format
+        self._intent_router: Optional[IntentRouter] = None
+        # Frozen system message shared by every request (stable prompt prefix)
+        self._system_message: Dict[str, str] = {
+            "role": "system",
+            "content": config.agent.system_message
+        }
+        # Hash of system message + tools, set at init (response cache key)
+        self._prefix_hash = ""
+        # HTTP ETag of the tool list, set at init
+        self._tools_etag = ""
+        self._response_cache = ResponseCache(
+            max_entries=config.agent.response_cache_size,
+            ttl_seconds=config.agent.response_cache_ttl
+        )
+        # Cache key -> future of the identical stateless request in flight
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
         self._initialized = False
-        self._init_lock = asyncio.Lock()
+        # Completed once initialization finishes; shared by callers on any
+        # event loop (the server loop and the sync bridge loop)
+        self._init_future: Optional[Future] = None
+        self._init_guard = threading.Lock()
+        # Persistent loop thread for the sync process_message bridge (started lazily)
+        self._bg_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bg_thread: Optional[threading.Thread] = None
+        self._bg_loop_lock = threading.Lock()
+        
+    async def initialize(self) -> None:
+        """
+        Initialize the agent explicitly (application startup).
         
+        Call from the event loop that will serve requests: MCP sessions
+        live on the loop they were created on. Requests still initialize
+        lazily if this was never called.
+        """
+        await self._ensure_initialized()
+
     async def _ensure_initialized(self):
-        """Ensure the agent is initialized (lazy initialization)."""
-        if self._initialized:
-            return
+        """
+        Ensure the agent is initialized (lazy initialization).
+        
+        The first caller runs _initialize_agent; concurrent callers wait
+        on the same future, so no request ever sees a half-loaded tool list.
+        """
+        while not self._initialized:
+            with self._init_guard:
+                init_future = self._init_future
+                is_owner = init_future is None
+                if is_owner:
+                    init_future = self._init_future = Future()
             
-        async with self._init_lock:
-            if self._initialized:
-                return
-            await self._initialize_agent()
-            self._initialized = True
+            if not is_owner:
+                # Wakes on success or on an aborted attempt (then retry).
+                # Shielded: cancelling this waiter must not cancel the
+                # future shared with the owner and the other waiters.
+                await asyncio.shield(asyncio.wrap_future(init_future))
+                continue
+            
+            try:
+                await self._initialize_agent()
+                self._initialized = True
+            finally:
+                if not self._initialized:
+                    # Aborted (e.g. cancelled): let the next caller retry
+                    with self._init_guard:
+                        self._init_future = None
+                if not init_future.done():
+                    init_future.set_result(None)
     
     async def _initialize_agent(self):
         """Initialize the OpenAI client and tools."""
         try:
+            from openai import AsyncOpenAI
+            
             # Configure OpenAI client
-            base_url = self._get_base_url()
+            base_url = self.base_url
             
-            self._client = OpenAI(
+            self._client = AsyncOpenAI(
                 api_key=config.llm.api_key,
                 base_url=base_url
             )
             
-            print(f"[AgentService] Initializing OpenAI client:")
-            print(f"  Model: {config.llm.model}")
-            print(f"  Base URL: {base_url}")
-            print(f"  API Key: {config.llm.api_key[:10]}..." if config.llm.api_key else "  API Key: Not set")
+            logger.info(
+                "[AgentService] Initializing OpenAI client: model=%s base_url=%s api_key=%s",
+                config.llm.model,
+                base_url,
+                f"{config.llm.api_key[:10]}..." if config.llm.api_key else "Not set"
+            )
             
             # Initialize tools using the new tool factory
-            from app.tools import initialize_tools_async, get_openai_tools
-            
             await initialize_tools_async()
-            self._tools = get_openai_tools()
+            # Deterministic order keeps the rendered prompt prefix byte-identical
+            # across requests and restarts, so server-side prefix caching hits
+            self._tools = sorted(get_openai_tools(), key=lambda t: t['function']['name'])
             
-            print(f"[AgentService] Loaded {len(self._tools)} tools in OpenAI format")
-            for tool in self._tools:
-                print(f"  - {tool['function']['name']}")
+            logger.info(
+                "[AgentService] Loaded %d tools in OpenAI format: %s",
+                len(self._tools),
+                ", ".join(tool['function']['name'] for tool in self._tools)
+            )
+            
+            prefix = json.dumps([self._system_message, self._tools], sort_keys=True, ensure_ascii=False)
+            self._prefix_hash = hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:16]
+            logger.info("[AgentService] Prompt prefix SHA256: %s", self._prefix_hash)
+            tools_json = json.dumps(self._tools, sort_keys=True, ensure_ascii=False)
+            self._tools_etag = '"%s"' % hashlib.sha256(tools_json.encode('utf-8')).hexdigest()[:16]
+            
+            if config.agent.fast_path_enabled:
+                self._intent_router = IntentRouter(tool['function']['name'] for tool in self._tools)
             
         except Exception as e:
-            print(f"[AgentService] Error during initialization: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[AgentService] Error during initialization: %s", e)
             self._client = None
 
-    def _get_base_url(self) -> str:
-        """Get the properly formatted base URL for OpenAI client."""
+    @cached_property
+    def base_url(self) -> str:
+        """
+        Get the properly formatted base URL for OpenAI client.
+        
+        Computed once per service; if config.llm.model_server changes at
+        runtime, invalidate with `self.__dict__.pop('base_url', None)`.
+        """
         base_url = config.llm.model_server
         
         # Remove trailing /chat/completions if present
         if base_url.endswith('/chat/completions'):
-            base_url = base_url.replace('/chat/completions', '')
+            base_url = base_url[:-len('/chat/completions')]
         
         # Ensure it ends with /v1 for OpenAI compatibility
         if not base_url.endswith('/v1'):
@@ -108,7 +220,8 @@ class AgentService:
     async def chat_with_session(
         self,
         session_id: str,
-        message: str
+        message: str,
+        max_turns: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Process a message within a specific session.
@@ -119,6 +232,8 @@ class AgentService:
         Args:
             session_id: The session ID
             message: The user's message
+            max_turns: Optional LLM turn budget for this call
+                (defaults to config.agent.max_turns)
             
         Returns:
             Dict containing 'response', 'thoughts', 'session_id'
@@ -137,14 +252,7 @@ class AgentService:
         session = session_manager.get_or_create_session(session_id)
         
         try:
-            # Run the agent loop in a thread pool
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                None, 
-                self._run_session_agent_loop, 
-                session, 
-                message
-            )
+            result = await self._run_session_agent_loop(session, message, max_turns=max_turns)
             
             return {
                 **result,
@@ -153,26 +261,36 @@ class AgentService:
             
         except Exception as e:
             error_msg = f"处理消息时发生错误: {str(e)}"
-            print(f"[AgentService] Error: {error_msg}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[AgentService] Error: %s", error_msg)
             return {
                 "response": error_msg,
                 "thoughts": [],
                 "session_id": session.session_id
             }
 
-    def _run_session_agent_loop(
+    async def _run_session_agent_loop(
         self,
         session: Session,
-        message: str
+        message: str,
+        on_delta: Optional[Callable[[str], None]] = None,
+        max_turns: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Main agent loop with session state.
+        Agent loop entry point with session state.
         
         Uses session's message history and control layer.
+        If on_delta is given, the LLM is called in streaming mode and each
+        content fragment is passed to it as it arrives.
         """
-        from app.tools import call_tool
+        # Unambiguous tool commands skip the LLM entirely
+        fast_result = await self._run_fast_path(message, session.control_layer, session)
+        if fast_result is not None:
+            if on_delta is not None:
+                on_delta(fast_result["response"])
+            return fast_result
+        
+        # Fold old history into a summary before it outgrows the window
+        await self._summarize_session_if_needed(session)
         
         # Add user message to session
         session.add_message("user", message)
@@ -180,187 +298,246 @@ class AgentService:
         # Build messages for LLM (system + session history)
         messages = self._build_messages_from_session(session)
         
-        # Use session's control layer
-        control_layer = session.control_layer
+        # Session-scoped prompt cache key (stable across the session's turns)
+        cache_key = session.session_id if config.llm.prompt_cache_key_enabled else None
         
-        # Tracking
-        all_thoughts = []
-        max_turns = 10
-        turn_count = 0
-        final_response = ""
+        logger.info("[AgentService] Session %s: Processing '%s...'", session.session_id, message[:50])
+        logger.debug("[AgentService] Session history: %d messages", len(session.messages))
         
-        print(f"[AgentService] Session {session.session_id}: Processing '{message[:50]}...'")
-        print(f"[AgentService] Session history: {len(session.messages)} messages")
+        return await self._agent_loop(
+            messages, session.control_layer, on_delta, max_turns, cache_key, session
+        )
+
+    def _build_messages_from_session(self, session: Session) -> List[Dict[str, Any]]:
+        """
+        Build messages list from session history.
         
-        while turn_count < max_turns:
-            turn_count += 1
-            print(f"\n--- [AgentLoop] Session {session.session_id} Turn {turn_count}/{max_turns} ---")
-            
-            try:
-                # ========== THINK: Call LLM ==========
-                response = self._call_llm(messages)
-                
-                if not response:
-                    print("[AgentLoop] Empty response from LLM")
-                    break
-                
-                response_message = response.choices[0].message
-                
-                # Record the assistant's response
-                all_thoughts.append({
-                    "role": "assistant",
-                    "content": response_message.content or "",
-                    "tool_calls": self._serialize_tool_calls(response_message.tool_calls)
-                })
-                
-                # Check if LLM wants to call tools
-                if response_message.tool_calls:
-                    # ========== EXECUTE: Process each tool call ==========
-                    # Add assistant message to messages (for next LLM call)
-                    messages.append(response_message)
-                    
-                    # Also add to session (for persistence)
-                    session.add_tool_call_message(response_message)
-                    
-                    should_stop = False
-                    
-                    for tool_call in response_message.tool_calls:
-                        tool_name = tool_call.function.name
-                        
-                        try:
-                            tool_args = json.loads(tool_call.function.arguments)
-                        except json.JSONDecodeError:
-                            tool_args = {}
-                        
-                        print(f"[AgentLoop] Executing tool: {tool_name}")
-                        
-                        # Record tool call in control layer
-                        control_layer.record_tool_call(tool_name, tool_args)
-                        
-                        # Execute the tool
-                        try:
-                            tool_result = call_tool(tool_name, tool_args)
-                        except Exception as e:
-                            tool_result = f"Error executing {tool_name}: {str(e)}"
-                        
-                        print(f"[AgentLoop] Tool result (prefix): {str(tool_result)[:100]}...")
-                        
-                        # ========== FEEDBACK: Add tool result ==========
-                        tool_msg = {
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": tool_name,
-                            "content": tool_result
-                        }
-                        messages.append(tool_msg)
-                        session.add_tool_result(tool_call.id, tool_name, tool_result)
-                        
-                        # Record in thoughts
-                        all_thoughts.append({
-                            "role": "tool",
-                            "tool_name": tool_name,
-                            "content": tool_result,
-                            "is_tool_result": True
-                        })
-                        
-                        # ========== CONTROL: Check termination ==========
-                        should_terminate, reason, term_message = control_layer.should_terminate_after_tool(
-                            tool_name, tool_result
-                        )
-                        
-                        if should_terminate:
-                            print(f"[AgentLoop] 🛑 Termination triggered: {reason.value if reason else 'unknown'}")
-                            
-                            termination_response = control_layer.get_termination_message(reason, tool_result)
-                            
-                            if response_message.content:
-                                final_response = f"{response_message.content}\n\n{termination_response}"
-                            else:
-                                final_response = termination_response
-                            
-                            # Add assistant response to session
-                            session.add_message("assistant", final_response)
-                            should_stop = True
-                            break
-                    
-                    if should_stop:
-                        break
-                    
-                    continue
-                
-                else:
-                    # ========== DONE: Final response ==========
-                    final_response = response_message.content or ""
-                    
-                    # Add to session history
-                    session.add_message("assistant", final_response)
-                    
-                    print(f"[AgentLoop] Final response received")
-                    break
-                    
-            except Exception as e:
-                print(f"[AgentLoop] Error in turn {turn_count}: {e}")
-                import traceback
-                traceback.print_exc()
-                final_response = f"处理过程中出错: {str(e)}"
-                session.add_message("assistant", final_response)
-                break
+        Includes system message + the most recent session messages, bounded
+        by config.agent.max_history_messages so prefill cost per request
+        does not grow with conversation age.
+        """
+        # Add system message (with the folded-history summary, if any)
+        if session.summary:
+            messages = [{
+                "role": "system",
+                "content": f"{self._system_message['content']}\n\n[历史对话摘要]\n{session.summary}"
+            }]
+        else:
+            messages = [self._system_message]
         
-        if not final_response and turn_count >= max_turns:
-            final_response = "⚠️ 达到最大对话轮次限制，请简化您的请求或分步骤进行。"
-            session.add_message("assistant", final_response)
+        # Add session history (dicts or OpenAI message objects)
+        messages.extend(self._window_history(session.messages))
         
-        # Clean up response
-        final_response = self._clean_response(final_response)
+        return messages
+
+    def _window_history(self, history: List[Any]) -> List[Any]:
+        """
+        Keep at most the last max_history_messages entries of a history.
         
-        print(f"[AgentService] Response: {final_response[:100]}...")
+        The cut point advances in steps of half the limit rather than one
+        message per turn, so the window start (and therefore the prompt
+        prefix seen by the server's prefix cache) stays byte-identical for
+        many consecutive requests instead of shifting on every turn.
+        
+        Leading tool results are dropped from the window, since a tool
+        message without its preceding assistant tool call is rejected by
+        the chat completions API.
+        """
+        limit = config.agent.max_history_messages
+        overflow = len(history) - limit
+        if overflow <= 0:
+            return history
+        
+        step = max(1, limit // 2)
+        start = -(-overflow // step) * step  # round overflow up to a step
+        while start < len(history) and self._message_role(history[start]) == "tool":
+            start += 1
+        return history[start:]
+
+    @staticmethod
+    def _message_role(msg: Any) -> Optional[str]:
+        """Get the role of a dict message or an OpenAI message object."""
+        if isinstance(msg, dict):
+            return msg.get("role")
+        return getattr(msg, "role", None)
+
+    async def _run_fast_path(
+        self,
+        message: str,
+        control_layer: ControlLayer,
+        session: Optional[Session] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Execute a message that the intent router maps to one tool call.
+        
+        The response is the matched rule's template filled with the tool
+        result, or the control layer's termination message when the call
+        trips one of its limits. When a session is given, the exchange is
+        persisted as a regular tool call (call id prefixed "fastpath_") so
+        later turns and audits see what ran. Returns None (fall through to
+        the agent loop) when nothing matches, the tool is not registered or
+        the tool raises.
+        """
+        if self._intent_router is None:
+            return None
+        
+        routed = self._intent_router.match(message)
+        if routed is None:
+            return None
+        
+        tool_name, tool_args, template = routed
+        tool = registry.get_tool(tool_name)
+        if tool is None:
+            return None
+        logger.info("[AgentService] Fast path: %s %s", tool_name, tool_args)
+        
+        # Called directly rather than through call_tool, which turns
+        # exceptions into an error string the user would get as the answer
+        try:
+            tool_result = await asyncio.to_thread(tool.call, tool_args)
+        except Exception as e:
+            logger.warning("[AgentService] Fast path failed, using agent loop: %s", e)
+            return None
+        
+        control_layer.record_tool_call(tool_name, tool_args)
+        
+        # Same termination checks as the agent loop (loop / call limits)
+        response = template.format(result=tool_result, **tool_args)
+        should_terminate, reason, _ = control_layer.should_terminate_after_tool(
+            tool_name, tool_result
+        )
+        if should_terminate:
+            logger.info("[AgentService] 🛑 Fast path termination: %s", reason.value)
+            response = control_layer.get_termination_message(reason, tool_result)
+        
+        tool_calls = [{
+            "id": f"fastpath_{secrets.token_hex(8)}",
+            "type": "function",
+            "function": {
+                "name": tool_name,
+                "arguments": json.dumps(tool_args, ensure_ascii=False)
+            }
+        }]
+        if session is not None:
+            session.add_message("user", message)
+            session.add_tool_call_message({
+                "role": "assistant",
+                "content": None,
+                "tool_calls": tool_calls
+            })
+            session.add_tool_result(tool_calls[0]["id"], tool_name, tool_result)
+            session.add_message("assistant", response)
         
         return {
-            "response": final_response,
-            "thoughts": all_thoughts
+            "response": response,
+            "thoughts": [{
+                "role": "assistant",
+                "content": "",
+                "tool_calls": tool_calls,
+                "fast_path": True
+            }, {
+                "role": "tool",
+                "tool_name": tool_name,
+                "content": tool_result,
+                "is_tool_result": True,
+                "fast_path": True
+            }]
         }
 
-    def _build_messages_from_session(self, session: Session) -> List[Dict[str, Any]]:
+    async def _summarize_session_if_needed(self, session: Session) -> None:
         """
-        Build messages list from session history.
+        Fold older session messages into session.summary.
         
-        Includes system message + all session messages.
+        Triggered once the history reaches config.agent.max_history_messages;
+        everything but the last history_keep_recent messages is summarized
+        by the LLM (together with any previous summary). The summary only
+        changes at these fold points, so the prompt prefix stays stable in
+        between. On failure the history is left untouched and the request
+        falls back to plain windowing.
         """
-        messages = []
+        agent_config = config.agent
+        if not agent_config.history_summary_enabled:
+            return
+        if len(session.messages) < agent_config.max_history_messages:
+            return
         
-        # Add system message
-        messages.append({
-            "role": "system",
-            "content": config.agent.system_message
-        })
+        # Cut on a user message so the kept history starts at a turn boundary
+        # (never between an assistant tool call and its tool results)
+        cut = len(session.messages) - agent_config.history_keep_recent
+        while cut > 0 and self._message_role(session.messages[cut]) != "user":
+            cut -= 1
+        if cut == 0:
+            return
         
-        # Add session history
-        for msg in session.messages:
-            # Handle different message types
-            if isinstance(msg, dict):
-                messages.append(msg)
-            else:
-                # OpenAI message object
-                messages.append(msg)
+        transcript = "\n".join(self._render_for_summary(msg) for msg in session.messages[:cut])
+        if session.summary:
+            transcript = f"[已有摘要]\n{session.summary}\n\n[新增对话]\n{transcript}"
         
-        return messages
+        try:
+            response = await self._client.chat.completions.create(
+                model=config.llm.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "请将以下对话总结为简洁的要点摘要，保留用户目标、关键参数、工具调用结果和尚未完成的事项。只输出摘要内容。"
+                    },
+                    {"role": "user", "content": transcript}
+                ],
+                temperature=0
+            )
+            summary = self._clean_response(response.choices[0].message.content or "")
+        except Exception as e:
+            logger.warning("[AgentService] History summarization failed: %s", e)
+            return
+        
+        if summary:
+            session.fold_history(cut, summary)
+            logger.info(
+                "[AgentService] Session %s: folded %d messages into summary",
+                session.session_id, cut
+            )
+
+    @staticmethod
+    def _render_for_summary(msg: Any, max_chars: int = 2000) -> str:
+        """Render one history message as a plain-text transcript line."""
+        if isinstance(msg, dict):
+            role = msg.get("role", "user")
+            content = msg.get("content") or ""
+            tool_calls = msg.get("tool_calls") or []
+        else:
+            role = getattr(msg, "role", "assistant")
+            content = getattr(msg, "content", None) or ""
+            tool_calls = getattr(msg, "tool_calls", None) or []
+        
+        if tool_calls:
+            names = ", ".join(
+                tc["function"]["name"] if isinstance(tc, dict) else tc.function.name
+                for tc in tool_calls
+            )
+            content = f"{content}\n[调用工具: {names}]".strip()
+        
+        return f"{role}: {content[:max_chars]}"
 
     # ==================== Legacy API (without session) ====================
 
     async def process_message_async(
         self, 
         message: str, 
-        history: Optional[List[Dict[str, Any]]] = None
+        history: Optional[List[Dict[str, Any]]] = None,
+        max_turns: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Process a message using the OpenAI API with function calling.
         
         LEGACY API: Creates a temporary session for this request.
         For persistent conversations, use chat_with_session() instead.
+        Answers that needed no tool call are cached (see ResponseCache).
         
         Args:
             message: The user's message
             history: Optional conversation history
+            max_turns: Optional LLM turn budget for this call
+                (defaults to config.agent.max_turns)
             
         Returns:
             Dict containing 'response' (str) and 'thoughts' (List[Dict])
@@ -373,62 +550,250 @@ class AgentService:
                 "thoughts": []
             }
         
+        # Repeated stateless questions are answered from the response cache
+        cache_key = ResponseCache.make_key(self._prefix_hash, message, history)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("[AgentService] Response cache hit")
+            return self._copy_result(cached)
+        
+        # Identical requests already in flight: wait for that run instead
+        # of starting another LLM call for the same prompt
+        with self._inflight_lock:
+            inflight = self._inflight.get(cache_key)
+            is_leader = inflight is None
+            if is_leader:
+                inflight = self._inflight[cache_key] = Future()
+        
+        if not is_leader:
+            # Shielded: a cancelled follower must not cancel the future
+            # the leader and the other followers are waiting on
+            shared = await asyncio.shield(asyncio.wrap_future(inflight))
+            if shared is not None:
+                logger.debug("[AgentService] Reused in-flight response")
+                return self._copy_result(shared)
+            # The leader's run used tools (or failed): run our own
+        
+        shareable = None
         try:
-            # Run the agent loop in a thread pool
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, self._run_agent_loop, message, history)
+            result = await self._run_agent_loop(message, history, max_turns=max_turns)
+            
+            # Only completed, tool-free answers are cached or shared, so
+            # commands always execute for every caller and errors are retried
+            if result.get("completed") and result["response"] and not any(
+                thought.get("tool_calls") or thought.get("role") == "tool"
+                for thought in result["thoughts"]
+            ):
+                shareable = self._copy_result(result)
+                self._response_cache.put(cache_key, shareable)
             return result
             
         except Exception as e:
             error_msg = f"处理消息时发生错误: {str(e)}"
-            print(f"[AgentService] Error: {error_msg}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[AgentService] Error: %s", error_msg)
             return {
                 "response": error_msg,
                 "thoughts": []
             }
+        
+        finally:
+            if is_leader:
+                with self._inflight_lock:
+                    self._inflight.pop(cache_key, None)
+                if not inflight.done():
+                    inflight.set_result(shareable)
+
+    @staticmethod
+    def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy a cacheable agent result, including its thoughts.
+        
+        Cached and shared results are copied on the way in and on the way
+        out, so no caller can mutate an entry seen by later requests.
+        Cacheable results made no tool calls, so thought dicts are flat.
+        """
+        return {**result, "thoughts": [dict(thought) for thought in result["thoughts"]]}
+
+    async def stream_message(
+        self,
+        message: str,
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of process_message_async.
+        
+        Yields {"type": "delta", "content": str} events while the LLM is
+        generating, followed by one {"type": "done", "response": ...,
+        "thoughts": [...]} event once the agent loop has finished.
+        """
+        await self._ensure_initialized()
+        
+        if self._client is None:
+            yield {
+                "type": "done",
+                "response": "[Agent未初始化] 无法处理消息，请检查配置。",
+                "thoughts": []
+            }
+            return
+        
+        async for event in self._stream_agent_loop(self._run_agent_loop, message, history):
+            yield event
 
-    def _run_agent_loop(
+    async def stream_with_session(
+        self,
+        session_id: str,
+        message: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of chat_with_session.
+        
+        Emits the same events as stream_message; the final "done" event
+        also carries the session_id.
+        """
+        await self._ensure_initialized()
+        
+        if self._client is None:
+            yield {
+                "type": "done",
+                "response": "[Agent未初始化] 无法处理消息，请检查配置。",
+                "thoughts": [],
+                "session_id": session_id
+            }
+            return
+        
+        session_manager = get_session_manager()
+        session = session_manager.get_or_create_session(session_id)
+        
+        async for event in self._stream_agent_loop(self._run_session_agent_loop, session, message):
+            if event["type"] == "done":
+                event["session_id"] = session.session_id
+            yield event
+
+    async def _stream_agent_loop(
+        self,
+        agent_loop: Callable[..., Awaitable[Dict[str, Any]]],
+        *args: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run an agent loop as a task and relay its content deltas through
+        an asyncio.Queue while it executes.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def on_delta(text: str) -> None:
+            queue.put_nowait({"type": "delta", "content": text})
+        
+        task = asyncio.create_task(agent_loop(*args, on_delta=on_delta))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            # Consumer went away (e.g. client disconnected): stop generating
+            if not task.done():
+                task.cancel()
+        
+        try:
+            result = task.result()
+        except Exception as e:
+            error_msg = f"处理消息时发生错误: {str(e)}"
+            logger.exception("[AgentService] Error: %s", error_msg)
+            result = {"response": error_msg, "thoughts": []}
+        
+        yield {"type": "done", **result}
+
+    async def _run_agent_loop(
         self, 
         message: str, 
-        history: Optional[List[Dict[str, Any]]] = None
+        history: Optional[List[Dict[str, Any]]] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        max_turns: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Main agent loop - Think-Execute-Feedback cycle.
+        Main agent loop without session state.
         
         LEGACY: Uses provided history instead of session.
+        If on_delta is given, content fragments are streamed to it.
         """
-        from app.tools import call_tool
-        
         # Create temporary control layer for this request
         control_layer = ControlLayer(ControlLayerConfig())
         
+        # Unambiguous tool commands skip the LLM entirely
+        fast_result = await self._run_fast_path(message, control_layer)
+        if fast_result is not None:
+            if on_delta is not None:
+                on_delta(fast_result["response"])
+            return fast_result
+        
         # Build messages list
         messages = self._build_messages(message, history)
         
+        # Stateless requests share only the system + tools prefix
+        cache_key = self._prefix_hash if config.llm.prompt_cache_key_enabled else None
+        
+        logger.info("[AgentService] Starting agent loop for: %.50s...", message)
+        
+        return await self._agent_loop(messages, control_layer, on_delta, max_turns, cache_key)
+
+    async def _agent_loop(
+        self,
+        messages: List[Any],
+        control_layer: ControlLayer,
+        on_delta: Optional[Callable[[str], None]] = None,
+        max_turns: Optional[int] = None,
+        cache_key: Optional[str] = None,
+        session: Optional[Session] = None
+    ) -> Dict[str, Any]:
+        """
+        Main agent loop - Think-Execute-Feedback cycle.
+        
+        Shared by the session and stateless entry points. When a session is
+        given, tool calls, tool results and the final response are also
+        persisted to its history.
+        
+        Args:
+            messages: Prepared LLM messages (extended in place)
+            control_layer: Control layer tracking this run
+            on_delta: Optional callback for streamed content fragments
+            max_turns: LLM turn budget (defaults to config.agent.max_turns)
+            cache_key: Optional prompt cache key sent with each LLM call
+            session: Optional session to persist the exchange to
+            
+        Returns:
+            Dict containing 'response' (str), 'thoughts' (List[Dict]) and
+            'completed' (bool, True only when the LLM gave a final answer;
+            False on errors, empty replies and exhausted turn budgets)
+        """
+        # Bind per-turn callables once (locals avoid repeated attribute lookups)
+        next_message = self._next_assistant_message
+        parse_args = self._parse_tool_args
+        record_tool_call = control_layer.record_tool_call
+        should_terminate_after_tool = control_layer.should_terminate_after_tool
+        
         # Tracking
         all_thoughts = []
-        max_turns = 10
+        if max_turns is None:
+            max_turns = config.agent.max_turns
         turn_count = 0
         final_response = ""
-        
-        print(f"[AgentService] Starting agent loop for: {message[:50]}...")
+        completed = False
         
         while turn_count < max_turns:
             turn_count += 1
-            print(f"\n--- [AgentLoop] Turn {turn_count}/{max_turns} ---")
+            logger.debug("--- [AgentLoop] Turn %d/%d ---", turn_count, max_turns)
             
             try:
                 # ========== THINK: Call LLM ==========
-                response = self._call_llm(messages)
+                response_message = await next_message(messages, on_delta, cache_key)
                 
-                if not response:
-                    print("[AgentLoop] Empty response from LLM")
+                if response_message is None:
+                    logger.warning("[AgentLoop] Empty response from LLM")
                     break
                 
-                response_message = response.choices[0].message
-                
                 # Record the assistant's response
                 all_thoughts.append({
                     "role": "assistant",
@@ -439,39 +804,52 @@ class AgentService:
                 # Check if LLM wants to call tools
                 if response_message.tool_calls:
                     # ========== EXECUTE: Process each tool call ==========
+                    # Add assistant message to messages (for next LLM call)
                     messages.append(response_message)
+                    if session is not None:
+                        session.add_tool_call_message(response_message)
                     
                     should_stop = False
                     
-                    for tool_call in response_message.tool_calls:
+                    tool_calls = response_message.tool_calls
+                    for index, tool_call in enumerate(tool_calls):
                         tool_name = tool_call.function.name
                         
-                        try:
-                            tool_args = json.loads(tool_call.function.arguments)
-                        except json.JSONDecodeError:
-                            tool_args = {}
+                        tool_args = parse_args(tool_call.function.arguments)
                         
-                        print(f"[AgentLoop] Executing tool: {tool_name}")
-                        print(f"[AgentLoop] Arguments: {json.dumps(tool_args, ensure_ascii=False)[:200]}")
+                        logger.info("[AgentLoop] Executing tool: %s", tool_name)
+                        logger.debug("[AgentLoop] Arguments: %.200s", tool_call.function.arguments)
                         
                         # Record tool call in control layer
-                        control_layer.record_tool_call(tool_name, tool_args)
+                        record_tool_call(tool_name, tool_args)
                         
-                        # Execute the tool
+                        # Execute the tool off the event loop (tools may block,
+                        # and MCP proxies wait on coroutines scheduled here)
                         try:
-                            tool_result = call_tool(tool_name, tool_args)
+                            tool_result = await asyncio.to_thread(call_tool, tool_name, tool_args)
+                        except asyncio.CancelledError:
+                            # Stream consumer went away mid-tool: answer the
+                            # pending calls so the session history stays valid
+                            if session is not None:
+                                for pending in tool_calls[index:]:
+                                    session.add_tool_result(
+                                        pending.id, pending.function.name, _TOOL_CALL_CANCELLED
+                                    )
+                            raise
                         except Exception as e:
                             tool_result = f"Error executing {tool_name}: {str(e)}"
                         
-                        print(f"[AgentLoop] Tool result (prefix): {str(tool_result)[:100]}...")
+                        logger.debug("[AgentLoop] Tool result (prefix): %.100s...", tool_result)
                         
-                        # ========== FEEDBACK: Add tool result to messages ==========
+                        # ========== FEEDBACK: Add tool result ==========
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
                             "name": tool_name,
                             "content": tool_result
                         })
+                        if session is not None:
+                            session.add_tool_result(tool_call.id, tool_name, tool_result)
                         
                         # Record in thoughts
                         all_thoughts.append({
@@ -482,13 +860,13 @@ class AgentService:
                         })
                         
                         # ========== CONTROL: Check termination conditions ==========
-                        should_terminate, reason, term_message = control_layer.should_terminate_after_tool(
+                        should_terminate, reason, term_message = should_terminate_after_tool(
                             tool_name, tool_result
                         )
                         
                         if should_terminate:
-                            print(f"[AgentLoop] 🛑 Termination triggered: {reason.value if reason else 'unknown'}")
-                            print(f"[AgentLoop] Message: {term_message}")
+                            logger.info("[AgentLoop] 🛑 Termination triggered: %s", reason.value if reason else 'unknown')
+                            logger.debug("[AgentLoop] Message: %s", term_message)
                             
                             termination_response = control_layer.get_termination_message(reason, tool_result)
                             
@@ -508,51 +886,180 @@ class AgentService:
                 else:
                     # ========== DONE: LLM gave final response ==========
                     final_response = response_message.content or ""
-                    print(f"[AgentLoop] Final response received (no more tool calls)")
+                    completed = True
+                    logger.debug("[AgentLoop] Final response received (no more tool calls)")
                     break
                     
             except Exception as e:
-                print(f"[AgentLoop] Error in turn {turn_count}: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("[AgentLoop] Error in turn %d: %s", turn_count, e)
                 final_response = f"处理过程中出错: {str(e)}"
                 break
         
         if not final_response and turn_count >= max_turns:
             final_response = "⚠️ 达到最大对话轮次限制，请简化您的请求或分步骤进行。"
         
+        # Add assistant response to session history
+        if session is not None and final_response:
+            session.add_message("assistant", final_response)
+        
         # Clean up response
         final_response = self._clean_response(final_response)
         
-        print(f"[AgentService] Response generated: {final_response[:100]}...")
+        logger.debug("[AgentService] Response generated: %.100s...", final_response)
         
         return {
             "response": final_response,
-            "thoughts": all_thoughts
+            "thoughts": all_thoughts,
+            "completed": completed
         }
 
-    def _call_llm(self, messages: List[Dict[str, Any]]) -> Any:
+    async def _next_assistant_message(
+        self,
+        messages: List[Dict[str, Any]],
+        on_delta: Optional[Callable[[str], None]] = None,
+        cache_key: Optional[str] = None
+    ) -> Optional["ChatCompletionMessage"]:
+        """
+        Run one THINK step and return the assistant message.
+        
+        Streams when on_delta is given; returns None on an empty response.
+        """
+        if on_delta is not None:
+            return await self._call_llm_stream(messages, on_delta, cache_key)
+        
+        response = await self._call_llm(messages, cache_key)
+        if not response:
+            return None
+        
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            logger.debug(
+                "[AgentService] Prompt tokens: %s (cached: %s)",
+                usage.prompt_tokens,
+                getattr(details, "cached_tokens", None)
+            )
+        
+        return response.choices[0].message
+
+    def _llm_params(
+        self,
+        messages: List[Dict[str, Any]],
+        cache_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build chat completion parameters for the given messages."""
+        params = {
+            "model": config.llm.model,
+            "messages": messages,
+            "temperature": config.llm.temperature,
+        }
+        
+        if self._tools:
+            params["tools"] = self._tools
+            params["tool_choice"] = "auto"
+        
+        if cache_key:
+            # Routing hint for the provider's prefix cache; sent as an extra
+            # body field so older SDKs without the parameter still work
+            params["extra_body"] = {"prompt_cache_key": cache_key}
+        
+        return params
+
+    async def _call_llm(
+        self,
+        messages: List[Dict[str, Any]],
+        cache_key: Optional[str] = None
+    ) -> Any:
         """
         Call the LLM with messages and tools.
         
+        Concurrent requests are submitted as independent in-flight calls on
+        the shared async client; batching them is left to the model
+        server's continuous-batching scheduler, since the chat completions
+        endpoint has no multi-prompt form to coalesce into.
+        
         Returns the raw response from OpenAI API.
         """
         try:
-            params = {
-                "model": config.llm.model,
-                "messages": messages,
-                "temperature": config.llm.temperature,
-            }
+            response = await self._client.chat.completions.create(**self._llm_params(messages, cache_key))
+            return response
+            
+        except Exception as e:
+            logger.error("[AgentService] LLM call error: %s", e)
+            raise
+
+    async def _call_llm_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        on_delta: Callable[[str], None],
+        cache_key: Optional[str] = None
+    ) -> "ChatCompletionMessage":
+        """
+        Call the LLM in streaming mode.
+        
+        Content fragments are forwarded to on_delta as they arrive. Tool call
+        fragments are reassembled so the returned message has the same shape
+        as a non-streaming response message.
+        """
+        from openai.types.chat import ChatCompletionMessage
+        
+        try:
+            stream = await self._client.chat.completions.create(
+                **self._llm_params(messages, cache_key),
+                stream=True
+            )
             
-            if self._tools:
-                params["tools"] = self._tools
-                params["tool_choice"] = "auto"
+            content_parts: List[str] = []
+            tool_calls: Dict[int, Dict[str, Any]] = {}
             
-            response = self._client.chat.completions.create(**params)
-            return response
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    delta = choice.delta
+                    
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        on_delta(delta.content)
+                    
+                    for tc in delta.tool_calls or ():
+                        slot = tool_calls.setdefault(tc.index, {"id": "", "name": "", "arguments": []})
+                        if tc.id:
+                            slot["id"] = tc.id
+                        if tc.function:
+                            if tc.function.name:
+                                slot["name"] += tc.function.name
+                            if tc.function.arguments:
+                                slot["arguments"].append(tc.function.arguments)
+                    
+                    # The message is complete once a finish_reason arrives;
+                    # don't wait on trailing chunks
+                    if choice.finish_reason:
+                        break
+            finally:
+                # Closing the response early (including on cancellation when
+                # a streaming client disconnects) lets the server stop decoding
+                await stream.close()
+            
+            return ChatCompletionMessage.model_validate({
+                "role": "assistant",
+                "content": "".join(content_parts) or None,
+                "tool_calls": [
+                    {
+                        "id": slot["id"],
+                        "type": "function",
+                        "function": {
+                            "name": slot["name"],
+                            "arguments": "".join(slot["arguments"])
+                        }
+                    }
+                    for _, slot in sorted(tool_calls.items())
+                ] or None
+            })
             
         except Exception as e:
-            print(f"[AgentService] LLM call error: {e}")
+            logger.error("[AgentService] LLM stream error: %s", e)
             raise
 
     def _build_messages(
@@ -565,17 +1072,12 @@ class AgentService:
         
         Includes system message, history, and current user message.
         """
-        messages = []
-        
         # Add system message
-        messages.append({
-            "role": "system",
-            "content": config.agent.system_message
-        })
+        messages = [self._system_message]
         
         # Add history if provided
         if history:
-            for msg in history:
+            for msg in self._window_history(history):
                 role = msg.get('role', 'user')
                 content = msg.get('content', '')
                 
@@ -593,6 +1095,26 @@ class AgentService:
         
         return messages
 
+    @staticmethod
+    def _parse_tool_args(arguments: str) -> Dict[str, Any]:
+        """
+        Parse the JSON arguments of a tool call.
+        
+        Small models sometimes wrap the arguments in a ```json fence; on a
+        decode failure the fence is stripped and parsing retried once before
+        falling back to empty arguments.
+        """
+        try:
+            return _json_loads(arguments)
+        except json.JSONDecodeError:
+            pass
+        
+        cleaned = arguments.strip().removeprefix('```json').removeprefix('```').removesuffix('```').strip()
+        try:
+            return _json_loads(cleaned)
+        except json.JSONDecodeError:
+            return {}
+
     def _serialize_tool_calls(self, tool_calls) -> Optional[List[Dict[str, Any]]]:
         """Serialize tool calls for storage in thoughts."""
         if not tool_calls:
@@ -612,21 +1134,22 @@ class AgentService:
 
     def _clean_response(self, text: str) -> str:
         """Clean up model response to remove formatting artifacts."""
-        import re
-        
         if not text:
             return text
         
-        # Remove <think>...</think> blocks
-        text = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
-        text = re.sub(r'</think>', '', text)
-        text = re.sub(r'<think>.*$', '', text, flags=re.DOTALL)
+        # Remove <think>...</think> blocks (cheap substring test first,
+        # so the regex engine only runs when a tag is present)
+        if _THINK_OPEN in text or _THINK_CLOSE in text:
+            text = _THINK_BLOCK_RE.sub('', text)
+            text = text.replace(_THINK_CLOSE, '')
+            text = _THINK_TAIL_RE.sub('', text)
         
         # Remove tool_call blocks if they leaked through
-        text = re.sub(r'<tool_call>.*?</tool_call>', '', text, flags=re.DOTALL)
+        if _TOOL_CALL_OPEN in text:
+            text = _TOOL_CALL_RE.sub('', text)
         
         # Clean up multiple newlines
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _EXTRA_NEWLINES_RE.sub('\n\n', text)
         
         text = text.strip()
         
@@ -637,35 +1160,98 @@ class AgentService:
         message: str, 
         history: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
-        """Synchronous wrapper for process_message_async."""
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-        if loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                return executor.submit(
-                    asyncio.run, 
-                    self.process_message_async(message, history)
-                ).result()
-        else:
-            return loop.run_until_complete(self.process_message_async(message, history))
+        """
+        Synchronous wrapper for process_message_async.
+        
+        Coroutines are submitted to one long-lived background event loop,
+        so sync callers (e.g. Flask worker threads) share the same loop and
+        AsyncOpenAI client instead of building a fresh loop per message.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.process_message_async(message, history),
+            self._get_bg_loop()
+        )
+        return future.result()
+
+    def run_conversation(self, messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """
+        Run the agent over a full message list (synchronous).
+        
+        The last message is the new user turn and the rest is its history.
+        Only the final assistant message is returned; intermediate tool
+        steps are not accumulated.
+        """
+        if not messages:
+            return []
+        
+        *history, last = messages
+        result = self.process_message(last.get('content', ''), history)
+        return [{'role': 'assistant', 'content': result['response']}]
+
+    def _get_bg_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the background loop used by process_message (thread-safe)."""
+        if self._bg_loop is None:
+            with self._bg_loop_lock:
+                if self._bg_loop is None:
+                    loop = asyncio.new_event_loop()
+                    # Run tasks eagerly until their first await (Python 3.12+)
+                    if hasattr(asyncio, "eager_task_factory"):
+                        loop.set_task_factory(asyncio.eager_task_factory)
+                    thread = threading.Thread(
+                        target=loop.run_forever,
+                        name="agent-sync-bridge",
+                        daemon=True
+                    )
+                    thread.start()
+                    self._bg_thread = thread
+                    self._bg_loop = loop
+                    atexit.register(self._stop_bg_loop)
+        return self._bg_loop
+
+    def _stop_bg_loop(self) -> None:
+        """Stop the background loop and join its thread (atexit hook)."""
+        loop, thread = self._bg_loop, self._bg_thread
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        if not thread.is_alive():
+            loop.close()
 
     def get_available_tools(self) -> List[Dict[str, Any]]:
-        """Get list of available tools in OpenAI format."""
+        """
+        Get list of available tools in OpenAI format.
+        
+        Returns the list built once in _initialize_agent (tools are fixed
+        after init), shared rather than copied; callers must not mutate it.
+        Empty until the service has been initialized.
+        """
+        return self._tools
+
+    async def get_available_tools_async(self) -> List[Dict[str, Any]]:
+        """Like get_available_tools, but initializes the service first."""
+        await self._ensure_initialized()
         return self._tools
 
+    def get_tools_etag(self) -> str:
+        """
+        Get the quoted HTTP ETag of the tool list (fixed after init).
+
+        Empty until the service has been initialized.
+        """
+        return self._tools_etag
+
 
 # Global agent service instance
 _agent_service_instance: Optional[AgentService] = None
+_agent_service_lock = threading.Lock()
 
 
 def get_agent_service() -> AgentService:
-    """Get the global agent service instance."""
+    """Get the global agent service instance (thread-safe)."""
     global _agent_service_instance
     if _agent_service_instance is None:
-        _agent_service_instance = AgentService()
+        with _agent_service_lock:
+            if _agent_service_instance is None:
+                _agent_service_instance = AgentService()
     return _agent_service_instance
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Response Cache - Reuse answers to repeated stateless queries
+
+Provides:
+1. Exact-match lookup on a normalized message + history + prompt prefix
+2. LRU eviction bounded by entry count
+3. Per-entry TTL expiration
+
+Only responses produced without any tool call should be stored, so
+side-effecting commands (e.g. laser control) always reach the tools.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU + TTL cache for agent responses.
+
+    Keys combine the prompt prefix hash (system message + tools), the
+    conversation history and the whitespace/case-normalized user message,
+    so a change of prompt or tools never serves a stale answer.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        prefix_hash: str,
+        message: str,
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """Build a cache key for a stateless request."""
+        normalized = " ".join(message.split()).casefold()
+        payload = json.dumps([prefix_hash, history or [], normalized], ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached response, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response, evicting the least recently used entry if full."""
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -9,17 +9,19 @@ Provides:
 
 No more global singleton - each session is independent.
 """
-import uuid
+import heapq
+import secrets
 import time
 import threading
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
 from app.agents.control_layer import ControlLayer, ControlLayerConfig
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     """
     Represents a single conversation session.
@@ -30,12 +32,18 @@ class Session:
     - Metadata
     """
     session_id: str
-    created_at: float = field(default_factory=time.time)
-    last_activity: float = field(default_factory=time.time)
+    # created_at / last_activity use time.monotonic() (cheap, immune to clock
+    # changes); created_at_wall anchors them to wall-clock time for display
+    created_at: float = field(default_factory=time.monotonic)
+    last_activity: float = field(default_factory=time.monotonic)
+    created_at_wall: float = field(default_factory=time.time)
     
     # Per-session message history (OpenAI format)
     messages: List[Dict[str, Any]] = field(default_factory=list)
     
+    # Summary of older messages folded out of the history
+    summary: str = ""
+    
     # Per-session control layer
     control_layer: ControlLayer = field(default_factory=lambda: ControlLayer(ControlLayerConfig()))
     
@@ -44,15 +52,13 @@ class Session:
     
     def add_message(self, role: str, content: str, **kwargs) -> None:
         """Add a message to the session history."""
-        msg = {"role": role, "content": content}
-        msg.update(kwargs)
-        self.messages.append(msg)
-        self.last_activity = time.time()
+        self.messages.append({"role": role, "content": content, **kwargs})
+        self.last_activity = time.monotonic()
     
     def add_tool_call_message(self, message: Any) -> None:
         """Add an assistant message with tool calls."""
         self.messages.append(message)
-        self.last_activity = time.time()
+        self.last_activity = time.monotonic()
     
     def add_tool_result(self, tool_call_id: str, name: str, content: str) -> None:
         """Add a tool result message."""
@@ -62,35 +68,55 @@ class Session:
             "name": name,
             "content": content
         })
-        self.last_activity = time.time()
+        self.last_activity = time.monotonic()
+    
+    def fold_history(self, count: int, summary: str) -> None:
+        """Replace the oldest `count` messages with a summary."""
+        del self.messages[:count]
+        self.summary = summary
+        self.last_activity = time.monotonic()
     
     def get_messages(self) -> List[Dict[str, Any]]:
-        """Get all messages in the session."""
+        """
+        Get a copy of all messages in the session (API boundary).
+        
+        Internal consumers read session.messages directly.
+        """
         return self.messages.copy()
     
     def clear_messages(self) -> None:
         """Clear message history but keep the session."""
         self.messages.clear()
+        self.summary = ""
         self.control_layer = ControlLayer(ControlLayerConfig())
-        self.last_activity = time.time()
+        self.last_activity = time.monotonic()
     
     def get_age_seconds(self) -> float:
         """Get session age in seconds."""
-        return time.time() - self.created_at
+        return time.monotonic() - self.created_at
     
     def get_idle_seconds(self) -> float:
         """Get idle time in seconds."""
-        return time.time() - self.last_activity
+        return time.monotonic() - self.last_activity
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Serialize session to dict (for API responses)."""
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Serialize session to dict (for API responses).
+        
+        Args:
+            now: time.monotonic() reading to use, so a bulk listing reads
+                the clock once instead of per session
+        """
+        if now is None:
+            now = time.monotonic()
+        last_activity_wall = self.created_at_wall + (self.last_activity - self.created_at)
         return {
             "session_id": self.session_id,
-            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
-            "last_activity": datetime.fromtimestamp(self.last_activity).isoformat(),
+            "created_at": datetime.fromtimestamp(self.created_at_wall).isoformat(),
+            "last_activity": datetime.fromtimestamp(last_activity_wall).isoformat(),
             "message_count": len(self.messages),
-            "age_seconds": self.get_age_seconds(),
-            "idle_seconds": self.get_idle_seconds(),
+            "age_seconds": now - self.created_at,
+            "idle_seconds": now - self.last_activity,
             "metadata": self.metadata
         }
 
@@ -100,6 +126,10 @@ class SessionManager:
     Manages multiple conversation sessions.
     
     Thread-safe session creation, retrieval, and cleanup.
+    
+    Sessions are kept in least-recently-used order (moved to the end on
+    every lookup), so LRU eviction only touches the front. Expiry uses a
+    min-heap of deadlines with one entry per session.
     """
     
     # Default session expiration: 30 minutes
@@ -115,8 +145,11 @@ class SessionManager:
         Args:
             expiration_seconds: Session expiration time (default 30 min)
         """
-        self._sessions: Dict[str, Session] = {}
-        self._lock = threading.RLock()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        # (expiry deadline, session_id); re-pushed lazily on later activity
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # Plain (non-reentrant) lock: no locked method calls another
+        self._lock = threading.Lock()
         self._expiration = expiration_seconds or self.DEFAULT_EXPIRATION_SECONDS
     
     def create_session(self, metadata: Optional[Dict[str, Any]] = None) -> Session:
@@ -135,13 +168,11 @@ class SessionManager:
             
             # Check max sessions
             if len(self._sessions) >= self.MAX_SESSIONS:
-                # Remove oldest session
-                oldest_id = min(self._sessions.keys(), 
-                               key=lambda k: self._sessions[k].last_activity)
-                del self._sessions[oldest_id]
+                # Remove least recently used session
+                self._sessions.popitem(last=False)
             
             # Generate unique session ID
-            session_id = f"session_{uuid.uuid4().hex[:16]}"
+            session_id = f"session_{secrets.token_hex(8)}"
             
             # Create session
             session = Session(
@@ -150,6 +181,7 @@ class SessionManager:
             )
             
             self._sessions[session_id] = session
+            heapq.heappush(self._expiry_heap, (session.last_activity + self._expiration, session_id))
             print(f"[SessionManager] Created session: {session_id}")
             
             return session
@@ -176,6 +208,7 @@ class SessionManager:
                 del self._sessions[session_id]
                 return None
             
+            self._sessions.move_to_end(session_id)
             return session
     
     def get_or_create_session(
@@ -226,27 +259,45 @@ class SessionManager:
         """
         with self._lock:
             self._cleanup_expired()
-            return [s.to_dict() for s in self._sessions.values()]
+            sessions = list(self._sessions.values())
+        
+        # Serialize outside the lock so lookups are not blocked meanwhile
+        now = time.monotonic()
+        return [s.to_dict(now) for s in sessions]
     
     def _cleanup_expired(self) -> int:
         """
         Remove expired sessions.
         
+        Pops heap entries whose deadline has passed. A session that saw
+        activity since its entry was pushed gets re-pushed with its real
+        deadline; entries of already-removed sessions are dropped. Cost is
+        O(k log N) for k due entries instead of a scan over all sessions.
+        
         Returns:
             Number of sessions removed
         """
-        expired = [
-            sid for sid, session in self._sessions.items()
-            if session.get_idle_seconds() > self._expiration
-        ]
+        heap = self._expiry_heap
+        now = time.monotonic()
+        expired = 0
         
-        for sid in expired:
-            del self._sessions[sid]
+        while heap and heap[0][0] <= now:
+            _, sid = heapq.heappop(heap)
+            session = self._sessions.get(sid)
+            if session is None:
+                continue
+            
+            deadline = session.last_activity + self._expiration
+            if deadline > now:
+                heapq.heappush(heap, (deadline, sid))
+            else:
+                del self._sessions[sid]
+                expired += 1
         
         if expired:
-            print(f"[SessionManager] Cleaned up {len(expired)} expired sessions")
+            print(f"[SessionManager] Cleaned up {expired} expired sessions")
         
-        return len(expired)
+        return expired
     
     def get_session_count(self) -> int:
         """Get number of active sessions."""
@@ -1,8 +1,6 @@
 from typing import Dict, Any, List, Optional
 from app.agents.base_agent import BaseAgent
 from app.agents.services.agent_service import get_agent_service
-from app.tools.mock_laser_control import MockLaserControl
-from app.tools.web_search_tool import WebSearchTool
 
 
 class THzAgent(BaseAgent):
@@ -7,9 +7,127 @@ Wraps MCP tool returns to provide:
 3. System instructions for the model
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from enum import Enum
+from functools import lru_cache
+from itertools import islice
 import json
+import re
+
+# orjson is optional: faster (de)serialization of tool results when installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch
+# the stdlib exception either way.
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps_pretty(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+
+    def _json_dumps_compact(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def _json_dumps_canonical(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps_pretty(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+
+    def _json_dumps_compact(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def _json_dumps_canonical(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+# Shared read-only default for missing context / arguments (never mutated)
+_EMPTY: Dict[str, Any] = {}
+
+
+class _ReadOnlyDict(dict):
+    """dict that rejects mutation; still serialized as a plain JSON object"""
+
+    __slots__ = ()
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("cached tool result payloads are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only deep view of a JSON-like value (dicts and lists frozen)"""
+    if type(value) is dict:
+        return _ReadOnlyDict({k: _freeze(v) for k, v in value.items()})
+    if type(value) is list:
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# Common ADS error messages (case-insensitive), checked in priority order
+_LIBRARY_NOT_OPEN_RE = re.compile(r"library.*?not\s+open", re.IGNORECASE | re.DOTALL)
+_CELL_NOT_FOUND_RE = re.compile(r"cell.*?not\s+found", re.IGNORECASE | re.DOTALL)
+_ERROR_WORD_RE = re.compile(r"error", re.IGNORECASE)
+
+# Guidance for the common ADS errors in the generic wrapper (no per-call parts)
+_INSTR_LIBRARY_NOT_OPEN = (
+    "⚠️ ISSUE: The specified library is not available.\n\n"
+    "Next steps:\n"
+    "1. Call 'get_project_structure' to see available libraries\n"
+    "2. Use an open library from the project structure\n"
+    "3. OR call 'create_schematic' to create a new design in the default workspace"
+)
+_INSTR_CELL_NOT_FOUND = (
+    "⚠️ ISSUE: The specified cell was not found.\n\n"
+    "Next steps:\n"
+    "1. Call 'get_project_structure' to see available cells\n"
+    "2. Call 'list_cells' with a library name to see all cells in a library\n"
+    "3. OR call 'create_schematic' to create a new cell"
+)
+
+
+def _ads_error_kind(error_msg: str) -> Optional[str]:
+    """Classify an ADS error message ('library_not_open', 'cell_not_found' or None)"""
+    # Library first: "cell not found because library X is not open" is a
+    # library problem
+    if _LIBRARY_NOT_OPEN_RE.search(error_msg):
+        return "library_not_open"
+    if _CELL_NOT_FOUND_RE.search(error_msg):
+        return "cell_not_found"
+    return None
+
+
+def _context_arguments(context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Get the tool call arguments from a wrapper context"""
+    return (context or _EMPTY).get("arguments") or _EMPTY
+
+
+def _unpack_result(
+    raw_result: Any
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Split a tool result into its dict form, nested 'data' dict and nested error.
+
+    Returns:
+        (result dict or None, data dict or None, error message if
+        data["status"] == "error" else None)
+    """
+    # Tool results are plain dicts/strs (JSON-decoded or MCP text), so the
+    # wrappers use exact type checks instead of isinstance
+    if type(raw_result) is not dict:
+        return None, None, None
+
+    data = raw_result.get("data")
+    if type(data) is not dict:
+        return raw_result, None, None
+
+    if data.get("status") == "error":
+        return raw_result, data, data.get("error") or data.get("message") or "Unknown error"
+    return raw_result, data, None
 
 
 class ToolStatus(Enum):
@@ -23,7 +141,14 @@ class ToolStatus(Enum):
 
 
 class ToolResult:
-    """Structured wrapper for tool results"""
+    """
+    Structured wrapper for tool results.
+
+    `summary` is the natural-language text shown to both the user and the
+    model (no internal instructions, so no JSON leakage); read it directly.
+    """
+
+    __slots__ = ("status", "_status_value", "summary", "data", "instruction", "raw_result")
 
     def __init__(
         self,
@@ -34,15 +159,23 @@ class ToolResult:
         raw_result: Optional[Any] = None
     ):
         self.status = status
+        # Status string cached once (Enum .value goes through a descriptor)
+        self._status_value: str = status.value
         self.summary = summary
         self.data = data or {}
         self.instruction = instruction
         self.raw_result = raw_result
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
+    def to_dict(self, include_raw: bool = False) -> Dict[str, Any]:
+        """
+        Convert to dictionary for JSON serialization.
+
+        Args:
+            include_raw: Also embed the raw tool payload (can be a large
+                nested MCP result, so it is left out by default)
+        """
         result = {
-            "status": self.status.value,
+            "status": self._status_value,
             "summary": self.summary
         }
 
@@ -52,33 +185,43 @@ class ToolResult:
         if self.instruction:
             result["instruction"] = self.instruction
 
-        if self.raw_result is not None:
+        if include_raw and self.raw_result is not None:
             result["raw_result"] = self.raw_result
 
         return result
 
-    def to_json(self) -> str:
-        """Convert to JSON string"""
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
-
-    def to_user_message(self) -> str:
+    def copy(self) -> "ToolResult":
+        """Shallow copy (own data dict, shared raw_result)"""
+        return self._clone(self.raw_result)
+
+    def _clone(self, raw_result: Optional[Any]) -> "ToolResult":
+        """Copy slots directly (skips __init__), with a new raw_result"""
+        clone = ToolResult.__new__(ToolResult)
+        clone.status = self.status
+        clone._status_value = self._status_value
+        clone.summary = self.summary
+        clone.data = dict(self.data)
+        clone.instruction = self.instruction
+        clone.raw_result = raw_result
+        return clone
+
+    def to_json(self, include_raw: bool = False, pretty: bool = False) -> str:
         """
-        Generate user-facing message (natural language only).
-        This prevents JSON leakage.
-        """
-        # Only return summary - no internal instructions
-        return self.summary
+        Convert to JSON string (see to_dict for include_raw).
 
-    def to_model_message(self) -> str:
+        Compact by default (for the model / machine consumers); pass
+        pretty=True for 2-space indented output meant for humans.
         """
-        Generate model-facing message.
-        
-        For small/quantized models, we keep this simple to avoid
-        the model echoing internal instructions to the user.
-        """
-        # Just return the summary - keep it simple for small models
-        # The model should generate its own response based on this
-        return self.summary
+        dumps = _json_dumps_pretty if pretty else _json_dumps_compact
+        return dumps(self.to_dict(include_raw))
+
+
+# Fallback results for unrecognized payloads; shared, never mutated (use _clone)
+_FALLBACK_COMPONENTS_ADDED = ToolResult(ToolStatus.SUCCESS, "Components added to design.")
+_FALLBACK_SCHEMATIC_CREATED = ToolResult(ToolStatus.SUCCESS, "Schematic created.")
+_FALLBACK_COMPONENT_ADDED = ToolResult(ToolStatus.SUCCESS, "Component added.")
+_FALLBACK_PROJECT_STRUCTURE = ToolResult(ToolStatus.SUCCESS, "Project structure retrieved.")
+_FALLBACK_DESIGN_STATUS = ToolResult(ToolStatus.SUCCESS, "Checked current design status.")
 
 
 def wrap_tool_result(
@@ -89,6 +232,12 @@ def wrap_tool_result(
     """
     Wrap a raw tool result into structured format.
 
+    String results (the MCP text path) are memoized on (tool_name,
+    raw_result, context), so repeated identical returns such as status
+    polls skip the wrapping. Every call gets its own ToolResult (and top
+    level data dict); the payload it shares with the cache (raw_result and
+    nested data values) is read-only, so mutating it raises TypeError.
+
     Args:
         tool_name: Name of the tool that was called
         raw_result: Raw result from MCP tool
@@ -97,39 +246,66 @@ def wrap_tool_result(
     Returns:
         ToolResult with structured fields
     """
-    # Try to parse if it's already a JSON string
-    if isinstance(raw_result, str):
+    if type(raw_result) is str:
         try:
-            parsed = json.loads(raw_result)
-            if isinstance(parsed, dict):
-                raw_result = parsed
-        except json.JSONDecodeError:
-            pass
+            context_key = _json_dumps_canonical(context) if context else None
+        except TypeError:
+            # Context not JSON-serializable: wrap without memoization
+            return _wrap_tool_result(tool_name, raw_result, context)
+        return _wrap_str_result_cached(tool_name, raw_result, context_key).copy()
 
-    # Special handling for specific tools
-    if tool_name == "add_components_from_plan":
-        return _wrap_add_components_result(raw_result, context)
+    return _wrap_tool_result(tool_name, raw_result, context)
+
+
+def wrap_tool_results(
+    items: Iterable[Tuple[str, Any, Optional[Dict[str, Any]]]]
+) -> List[ToolResult]:
+    """
+    Wrap several raw tool results in one call (e.g. all tool calls of a turn).
 
-    elif tool_name == "execute_circuit_plan":
-        return _wrap_execute_plan_result(raw_result, context)
+    Args:
+        items: (tool_name, raw_result, context) tuples
 
-    elif tool_name == "plan_circuit":
-        return _wrap_plan_circuit_result(raw_result, context)
+    Returns:
+        ToolResults in the same order as items
+    """
+    wrap = wrap_tool_result
+    return [wrap(tool_name, raw_result, context) for tool_name, raw_result, context in items]
 
-    elif tool_name == "add_component":
-        return _wrap_add_component_result(raw_result, context)
 
-    elif tool_name == "check_cell_exists":
-        return _wrap_check_cell_exists_result(raw_result, context)
+@lru_cache(maxsize=256)
+def _wrap_str_result_cached(
+    tool_name: str,
+    raw_result: str,
+    context_key: Optional[str]
+) -> ToolResult:
+    """Memoized wrap of a string result (context passed as canonical JSON)"""
+    context = _json_loads(context_key) if context_key is not None else None
+    result = _wrap_tool_result(tool_name, raw_result, context)
+    # Frozen once here, so cache hits hand it out without copying
+    result.raw_result = _freeze(result.raw_result)
+    result.data = _freeze(result.data)
+    return result
 
-    elif tool_name == "get_project_structure":
-        return _wrap_get_project_structure_result(raw_result, context)
 
-    elif tool_name == "get_current_design":
-        return _wrap_get_current_design_result(raw_result, context)
+def _wrap_tool_result(
+    tool_name: str,
+    raw_result: Any,
+    context: Optional[Dict[str, Any]]
+) -> ToolResult:
+    """Parse a JSON string result if possible, then dispatch to a wrapper"""
+    # Try to parse if it's already a JSON object string; plain text such as
+    # "PLAN_ID: ..." is recognized by its first character and never parsed
+    if type(raw_result) is str and raw_result.lstrip()[:1] == "{":
+        try:
+            parsed = _json_loads(raw_result)
+            if type(parsed) is dict:
+                raw_result = parsed
+        except json.JSONDecodeError:
+            pass
 
-    # Default wrapping
-    return _wrap_generic_result(raw_result, context)
+    # Special handling for specific tools, default wrapping otherwise
+    return _DISPATCH.get(tool_name, _wrap_generic_result)(raw_result, context)
 
 
 def _wrap_add_components_result(
@@ -137,7 +313,7 @@ def _wrap_add_components_result(
     context: Optional[Dict[str, Any]]
 ) -> ToolResult:
     """Wrap add_components_from_plan result"""
-    if isinstance(raw_result, dict):
+    if type(raw_result) is dict:
         success = raw_result.get("success", True)
         status = ToolStatus.SUCCESS if success else ToolStatus.FAILED
 
@@ -170,11 +346,7 @@ def _wrap_add_components_result(
             )
 
     # Fallback for non-dict results
-    return ToolResult(
-        status=ToolStatus.SUCCESS,
-        summary="Components added to design.",
-        raw_result=raw_result
-    )
+    return _FALLBACK_COMPONENTS_ADDED._clone(raw_result)
 
 
 def _wrap_execute_plan_result(
@@ -182,7 +354,7 @@ def _wrap_execute_plan_result(
     context: Optional[Dict[str, Any]]
 ) -> ToolResult:
     """Wrap execute_circuit_plan result"""
-    if isinstance(raw_result, dict):
+    if type(raw_result) is dict:
         success = raw_result.get("success", True)
         status = ToolStatus.SUCCESS if success else ToolStatus.FAILED
 
@@ -213,11 +385,7 @@ def _wrap_execute_plan_result(
                 raw_result=raw_result
             )
 
-    return ToolResult(
-        status=ToolStatus.SUCCESS,
-        summary="Schematic created.",
-        raw_result=raw_result
-    )
+    return _FALLBACK_SCHEMATIC_CREATED._clone(raw_result)
 
 
 def _wrap_plan_circuit_result(
@@ -227,9 +395,10 @@ def _wrap_plan_circuit_result(
     """Wrap plan_circuit result"""
     # Extract plan_id
     plan_id = None
-    if isinstance(raw_result, str) and raw_result.startswith("PLAN_ID:"):
-        plan_id = raw_result.split("\n")[0].split(": ")[1]
-    elif isinstance(raw_result, dict):
+    if type(raw_result) is str and raw_result.startswith("PLAN_ID:"):
+        # Only the first line is needed; partition never raises on malformed input
+        plan_id = raw_result.partition("\n")[0].partition(": ")[2] or None
+    elif type(raw_result) is dict:
         plan_id = raw_result.get("plan_id")
 
     summary = f"✅ Circuit plan generated."
@@ -255,13 +424,14 @@ def _wrap_add_component_result(
     context: Optional[Dict[str, Any]]
 ) -> ToolResult:
     """Wrap add_component result"""
-    if isinstance(raw_result, dict):
+    if type(raw_result) is dict:
         success = raw_result.get("status") == "success"
         status = ToolStatus.SUCCESS if success else ToolStatus.FAILED
 
         if success:
-            instance_name = context.get("instance_name", "") if context else ""
-            component_type = context.get("component_type", "") if context else ""
+            context = context or _EMPTY
+            instance_name = context.get("instance_name", "")
+            component_type = context.get("component_type", "")
             summary = f"✅ Added component {component_type} ({instance_name})."
 
             return ToolResult(
@@ -278,11 +448,7 @@ def _wrap_add_component_result(
                 raw_result=raw_result
             )
 
-    return ToolResult(
-        status=ToolStatus.SUCCESS,
-        summary="Component added.",
-        raw_result=raw_result
-    )
+    return _FALLBACK_COMPONENT_ADDED._clone(raw_result)
 
 
 def _wrap_check_cell_exists_result(
@@ -292,22 +458,20 @@ def _wrap_check_cell_exists_result(
     """Wrap check_cell_exists result"""
     
     # Extract arguments from context
-    library_name = context.get("arguments", {}).get("library_name", "unknown") if context else "unknown"
-    cell_name = context.get("arguments", {}).get("cell_name", "unknown") if context else "unknown"
-    
-    if isinstance(raw_result, dict):
+    args = _context_arguments(context)
+    library_name = args.get("library_name", "unknown")
+    cell_name = args.get("cell_name", "unknown")
+
+    raw, data, error_msg = _unpack_result(raw_result)
+    if raw is not None:
         # NEW FORMAT: Check for 'message' field from ads_server.py
-        message = raw_result.get("message", "")
+        message = raw.get("message", "")
         
         # Check for nested error in data field
-        if 'data' in raw_result and isinstance(raw_result['data'], dict):
-            data = raw_result['data']
-            
-            if data.get("status") == "error":
-                error_msg = data.get('error', 'Unknown error')
-
+        if data is not None:
+            if error_msg:
                 # Parse library not open error
-                if "library" in error_msg.lower() and "not open" in error_msg.lower():
+                if _ads_error_kind(error_msg) == "library_not_open":
                     summary = f"❌ 库 '{library_name}' 不存在或未打开！"
                     instruction = (
                         f"⚠️ 您输入的库名 '{library_name}' 不正确。\n\n"
@@ -333,9 +497,8 @@ def _wrap_check_cell_exists_result(
                 )
             
             # Check for successful cell exists check
-            if data.get("exists") is not None:
-                exists = data.get("exists", False)
-                
+            exists = data.get("exists")
+            if exists is not None:
                 if exists:
                     summary = f"✅ 单元 '{cell_name}' 存在于库 '{library_name}' 中。"
                     instruction = (
@@ -377,46 +540,53 @@ def _wrap_check_cell_exists_result(
 
 
 
+@lru_cache(maxsize=64)
+def _format_project_structure(lib_names: Tuple[str, ...], lib_count: int) -> Tuple[str, str]:
+    """Build (summary, instruction) from the first library names and the total count"""
+    summary = f"✅ Retrieved project structure with {lib_count} libraries."
+
+    if lib_count > 0:
+        # List available libraries
+        lib_list = ", ".join(lib_names)  # First 5 only
+        if lib_count > 5:
+            lib_list += f" ... and {lib_count - 5} more"
+
+        instruction = (
+            f"Available libraries: {lib_list}\n\n"
+            f"You can now:\n"
+            f"1. Use 'list_cells' with a library name to see cells\n"
+            f"2. Use 'check_cell_exists' to verify specific cells\n"
+            f"3. Use 'create_schematic' to create new designs"
+        )
+    else:
+        instruction = "No libraries found. You may need to create a new schematic."
+
+    return summary, instruction
+
+
 def _wrap_get_project_structure_result(
     raw_result: Any,
     context: Optional[Dict[str, Any]]
 ) -> ToolResult:
     """Wrap get_project_structure result"""
-    if isinstance(raw_result, dict):
+    raw, data, error_msg = _unpack_result(raw_result)
+    if raw is not None:
         # Check for error
-        if 'data' in raw_result and isinstance(raw_result['data'], dict):
-            data = raw_result['data']
-            if data.get("status") == "error":
-                error_msg = data.get('error', 'Unknown error')
-                return ToolResult(
-                    status=ToolStatus.ERROR,
-                    summary=f"❌ Failed to get project structure: {error_msg}",
-                    raw_result=raw_result
-                )
+        if error_msg:
+            return ToolResult(
+                status=ToolStatus.ERROR,
+                summary=f"❌ Failed to get project structure: {error_msg}",
+                raw_result=raw_result
+            )
 
         # Successfully retrieved project structure
-        if raw_result.get("status") == "success":
-            libraries = raw_result.get("data", {}).get("libraries", [])
-            lib_count = len(libraries) if isinstance(libraries, list) else 0
-
-            summary = f"✅ Retrieved project structure with {lib_count} libraries."
-
-            if lib_count > 0:
-                # List available libraries
-                lib_names = [lib.get("name", "unknown") for lib in libraries] if isinstance(libraries, list) else []
-                lib_list = ", ".join(lib_names[:5])  # Show first 5
-                if len(lib_names) > 5:
-                    lib_list += f" ... and {len(lib_names) - 5} more"
-
-                instruction = (
-                    f"Available libraries: {lib_list}\n\n"
-                    f"You can now:\n"
-                    f"1. Use 'list_cells' with a library name to see cells\n"
-                    f"2. Use 'check_cell_exists' to verify specific cells\n"
-                    f"3. Use 'create_schematic' to create new designs"
-                )
-            else:
-                instruction = "No libraries found. You may need to create a new schematic."
+        if raw.get("status") == "success":
+            libraries = (data or _EMPTY).get("libraries", [])
+            if not isinstance(libraries, list):
+                libraries = []
+            # Only the first 5 names are shown; don't collect the rest
+            lib_names = tuple(lib.get("name", "unknown") for lib in islice(libraries, 5))
+            summary, instruction = _format_project_structure(lib_names, len(libraries))
 
             return ToolResult(
                 status=ToolStatus.SUCCESS,
@@ -425,11 +595,7 @@ def _wrap_get_project_structure_result(
                 raw_result=raw_result
             )
 
-    return ToolResult(
-        status=ToolStatus.SUCCESS,
-        summary="Project structure retrieved.",
-        raw_result=raw_result
-    )
+    return _FALLBACK_PROJECT_STRUCTURE._clone(raw_result)
 
 
 def _wrap_get_current_design_result(
@@ -437,22 +603,21 @@ def _wrap_get_current_design_result(
     context: Optional[Dict[str, Any]]
 ) -> ToolResult:
     """Wrap get_current_design result"""
-    if isinstance(raw_result, dict):
+    raw, data, error_msg = _unpack_result(raw_result)
+    if raw is not None:
         # Check for error
-        if 'data' in raw_result and isinstance(raw_result['data'], dict):
-            data = raw_result['data']
-            if data.get("status") == "error":
-                error_msg = data.get('error', 'Unknown error')
-                return ToolResult(
-                    status=ToolStatus.ERROR,
-                    summary=f"无法获取当前设计信息: {error_msg}",
-                    raw_result=raw_result
-                )
+        if error_msg:
+            return ToolResult(
+                status=ToolStatus.ERROR,
+                summary=f"无法获取当前设计信息: {error_msg}",
+                raw_result=raw_result
+            )
 
         # Check if design is open
-        design_uri = raw_result.get("data", {}).get("design_uri")
-        cell_name = raw_result.get("data", {}).get("cell_name")
-        library_name = raw_result.get("data", {}).get("library_name")
+        data = data or _EMPTY
+        design_uri = data.get("design_uri")
+        cell_name = data.get("cell_name")
+        library_name = data.get("library_name")
 
         if design_uri and design_uri != "None":
             # Design is open - simple message
@@ -475,11 +640,7 @@ def _wrap_get_current_design_result(
             )
 
     # Fallback
-    return ToolResult(
-        status=ToolStatus.SUCCESS,
-        summary="Checked current design status.",
-        raw_result=raw_result
-    )
+    return _FALLBACK_DESIGN_STATUS._clone(raw_result)
 
 
 def _wrap_generic_result(
@@ -491,59 +652,47 @@ def _wrap_generic_result(
     summary = "Tool executed successfully."
     instruction = None
 
-    if isinstance(raw_result, dict):
+    raw, data, data_error = _unpack_result(raw_result)
+    if raw is not None:
         # Check for errors at multiple levels
         error_msg = None
 
         # Level 1: Check top-level status
-        if raw_result.get("status") == "error":
-            error_msg = raw_result.get('message') or raw_result.get('error', 'Unknown error')
+        top_status = raw.get("status")
+        if top_status == "error":
+            error_msg = raw.get('message') or raw.get('error', 'Unknown error')
             status = ToolStatus.ERROR
-        elif raw_result.get("success") == False:
-            error_msg = raw_result.get('error', 'Unknown error')
+        elif raw.get("success") == False:
+            error_msg = raw.get('error', 'Unknown error')
             status = ToolStatus.FAILED
 
         # Level 2: Check nested data field
-        elif 'data' in raw_result and isinstance(raw_result['data'], dict):
-            data = raw_result['data']
-            if data.get("status") == "error":
-                error_msg = data.get('error', data.get('message', 'Unknown error'))
-                status = ToolStatus.ERROR
-            elif data.get("error"):
-                error_msg = data.get('error')
-                status = ToolStatus.ERROR
+        elif data_error:
+            error_msg = data_error
+            status = ToolStatus.ERROR
+        elif data is not None and data.get("error"):
+            error_msg = data["error"]
+            status = ToolStatus.ERROR
 
         # Build summary and instruction based on error
         if error_msg:
             # Parse common ADS errors and provide helpful guidance
-            if "library" in error_msg.lower() and "not open" in error_msg.lower():
-                library_name = context.get("arguments", {}).get("library_name", "unknown") if context else "unknown"
+            error_kind = _ads_error_kind(error_msg)
+            if error_kind == "library_not_open":
+                library_name = _context_arguments(context).get("library_name", "unknown")
                 summary = f"❌ Library '{library_name}' is not open in ADS."
-                instruction = (
-                    f"⚠️ ISSUE: The specified library is not available.\n\n"
-                    f"Next steps:\n"
-                    f"1. Call 'get_project_structure' to see available libraries\n"
-                    f"2. Use an open library from the project structure\n"
-                    f"3. OR call 'create_schematic' to create a new design in the default workspace"
-                )
-            elif "cell" in error_msg.lower() and "not found" in error_msg.lower():
-                cell_name = context.get("arguments", {}).get("cell_name", "unknown") if context else "unknown"
+                instruction = _INSTR_LIBRARY_NOT_OPEN
+            elif error_kind == "cell_not_found":
+                cell_name = _context_arguments(context).get("cell_name", "unknown")
                 summary = f"❌ Cell '{cell_name}' does not exist."
-                instruction = (
-                    f"⚠️ ISSUE: The specified cell was not found.\n\n"
-                    f"Next steps:\n"
-                    f"1. Call 'get_project_structure' to see available cells\n"
-                    f"2. Call 'list_cells' with a library name to see all cells in a library\n"
-                    f"3. OR call 'create_schematic' to create a new cell"
-                )
+                instruction = _INSTR_CELL_NOT_FOUND
             else:
                 summary = f"❌ Error: {error_msg}"
                 instruction = "Please review the error and try a different approach."
 
-        elif raw_result.get("status") == "success" and 'data' in raw_result:
+        elif top_status == "success" and 'data' in raw:
             # Successful result with data
-            data = raw_result.get('data', {})
-            if isinstance(data, dict):
+            if data is not None:
                 # Extract meaningful info from success data
                 if 'uri' in data:
                     summary = f"✅ Operation completed. URI: {data['uri']}"
@@ -554,14 +703,15 @@ def _wrap_generic_result(
             else:
                 summary = "✅ Operation completed successfully."
 
-    elif isinstance(raw_result, str):
-        if "error" in raw_result.lower():
+    elif type(raw_result) is str:
+        if _ERROR_WORD_RE.search(raw_result):
             status = ToolStatus.ERROR
             # Check for common error patterns
-            if "library" in raw_result.lower() and "not open" in raw_result.lower():
+            error_kind = _ads_error_kind(raw_result)
+            if error_kind == "library_not_open":
                 summary = "❌ Library is not open in ADS."
                 instruction = "Call 'get_project_structure' to see available libraries."
-            elif "cell" in raw_result.lower() and "not found" in raw_result.lower():
+            elif error_kind == "cell_not_found":
                 summary = "❌ Cell does not exist."
                 instruction = "Call 'list_cells' to see available cells."
             else:
@@ -575,3 +725,15 @@ def _wrap_generic_result(
         instruction=instruction,
         raw_result=raw_result
     )
+
+
+# Tool name -> result wrapper (tools not listed use _wrap_generic_result)
+_DISPATCH: Dict[str, Callable[[Any, Optional[Dict[str, Any]]], ToolResult]] = {
+    "add_components_from_plan": _wrap_add_components_result,
+    "execute_circuit_plan": _wrap_execute_plan_result,
+    "plan_circuit": _wrap_plan_circuit_result,
+    "add_component": _wrap_add_component_result,
+    "check_cell_exists": _wrap_check_cell_exists_result,
+    "get_project_structure": _wrap_get_project_structure_result,
+    "get_current_design": _wrap_get_current_design_result,
+}
@@ -0,0 +1,26 @@
+from fastapi import FastAPI
+from starlette.middleware.gzip import GZipMiddleware
+
+
+class StreamAwareGZipMiddleware:
+    """
+    GZip for regular JSON responses, bypassed for NDJSON stream endpoints.
+
+    Compressing a token stream would make gzip buffer the deltas until its
+    block fills, so paths ending in '/stream' are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 512, compresslevel: int = 6):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].endswith("/stream"):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+def init_compression(app: FastAPI, minimum_size: int = 512, compresslevel: int = 6):
+    """Compress responses for clients sending Accept-Encoding: gzip"""
+    app.add_middleware(StreamAwareGZipMiddleware, minimum_size=minimum_size, compresslevel=compresslevel)
@@ -1,25 +1,49 @@
-from flask import Flask
-from flask_cors import CORS
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
 
 
-def init_cors(app: Flask):
-    """Initialize CORS for the Flask app"""
-    CORS(app, resources={
-        r"/api/*": {
-            "origins": ["*"],  # In production, restrict this to specific origins
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
-        }
-    })
+# Security headers, pre-encoded as raw ASGI header pairs
+_SECURITY_HEADERS = (
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+)
 
 
-def add_security_headers(app: Flask):
+def init_cors(app: FastAPI):
+    """Initialize CORS for the FastAPI app"""
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, restrict this to specific origins
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        allow_headers=["Content-Type", "Authorization"],
+    )
+
+
+class SecurityHeadersMiddleware:
+    """
+    Pure ASGI middleware adding the security headers to every HTTP response.
+
+    Headers are appended to the response-start message directly, so there is
+    no per-request Response wrapping and streaming bodies pass through as-is.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *_SECURITY_HEADERS]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def add_security_headers(app: FastAPI):
     """Add security headers to responses"""
-    @app.after_request
-    def after_request(response):
-        # Security headers
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'DENY'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-
-        return response
\ No newline at end of file
+    app.add_middleware(SecurityHeadersMiddleware)
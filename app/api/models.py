@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, List, Optional
+from typing_extensions import TypedDict
+
+
+class HistoryMessage(TypedDict):
+    """
+    History entry; validated in pydantic-core and kept as a plain dict.
+
+    Extra keys (tool_calls, tool_call_id, ...) are passed through.
+    """
+    __pydantic_config__ = ConfigDict(extra='allow')
+    role: str
+    content: Any
+
+
+class ChatRequest(BaseModel):
+    """Legacy chat request (stateless)."""
+    message: str
+    history: Optional[List[HistoryMessage]] = []
@@ -1,53 +1,68 @@
-from flask import Blueprint, request, jsonify
+from fastapi import APIRouter, HTTPException, Request, Response
+from functools import lru_cache
 from app.tools.registry import registry
-from typing import Dict, Any
+from typing import Any, Dict, List, Tuple
+import hashlib
+import json
 
 
-tools_bp = Blueprint('tools', __name__, url_prefix='/api/v1/tools')
+tools_router = APIRouter(prefix='/api/v1/tools')
 
 
-@tools_bp.route('/list', methods=['GET'])
-def list_tools():
+@lru_cache(maxsize=1)
+def _tool_catalog(version: int) -> Tuple[str, List[Dict[str, Any]]]:
+    """Tool schemas and their ETag for a registry version"""
+    schemas = registry.get_tool_schemas()
+    digest = hashlib.blake2b(json.dumps(schemas, sort_keys=True).encode('utf-8'), digest_size=8)
+    return f'"{digest.hexdigest()}"', schemas
+
+
+def _not_modified(request: Request, response: Response, etag: str) -> bool:
+    """Set caching headers; True if the client already has this version"""
+    if request.headers.get('if-none-match') == etag:
+        return True
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'private, max-age=60'
+    return False
+
+
+@tools_router.get('/list')
+async def list_tools(request: Request, response: Response):
     """Endpoint to list all registered tools"""
-    try:
-        tool_specs = registry.list_tool_specs()
-        return jsonify({
-            'success': True,
-            'tools': tool_specs
-        })
-    except Exception as e:
-        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
-
-
-@tools_bp.route('/register', methods=['POST'])
-def register_tool():
-    """Admin endpoint to register a new tool (placeholder - implementation would require admin auth)"""
-    try:
-        # This is a placeholder - in a real implementation, this would require authentication
-        # and the ability to dynamically load and register new tools
+    etag, schemas = _tool_catalog(registry.version)
+    if _not_modified(request, response, etag):
+        return Response(status_code=304, headers={'ETag': etag})
 
-        return jsonify({
-            'success': False,
-            'error': 'Dynamic tool registration not implemented in this version'
-        }), 400
-    except Exception as e:
-        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+    return {
+        'success': True,
+        'tools': schemas
+    }
 
 
-@tools_bp.route('/<tool_name>', methods=['GET'])
-def get_tool_details(tool_name: str):
+@tools_router.post('/register')
+async def register_tool():
+    """Admin endpoint to register a new tool (placeholder - implementation would require admin auth)"""
+    # This is a placeholder - in a real implementation, this would require authentication
+    # and the ability to dynamically load and register new tools
+    raise HTTPException(
+        status_code=400,
+        detail='Dynamic tool registration not implemented in this version'
+    )
+
+
+@tools_router.get('/{tool_name}')
+async def get_tool_details(tool_name: str, request: Request, response: Response):
     """Get details for a specific tool"""
-    try:
-        # Check if the tool exists
-        if tool_name not in registry.list_tool_names():
-            return jsonify({'error': f'Tool "{tool_name}" not found'}), 404
-
-        tool_class = registry.get_tool_class(tool_name)
-        tool_instance = registry.get_tool_instance(tool_name)
-
-        return jsonify({
-            'success': True,
-            'tool': tool_instance.get_spec()
-        })
-    except Exception as e:
-        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
\ No newline at end of file
+    # Check if the tool exists
+    if not registry.has_tool(tool_name):
+        raise HTTPException(status_code=404, detail=f'Tool "{tool_name}" not found')
+
+    # Any registry change yields a new catalog ETag, so derive the tool's from it
+    etag = f'{_tool_catalog(registry.version)[0][:-1]}-{tool_name}"'
+    if _not_modified(request, response, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+
+    return {
+        'success': True,
+        'tool': registry.get_tool(tool_name).get_json_schema()
+    }
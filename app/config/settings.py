@@ -1,19 +1,79 @@
+import json
 import os
+from functools import lru_cache
 from typing import Optional, List
 from pydantic import BaseModel, Field
 from pathlib import Path
 
-# Load .env file if it exists
-try:
-    from dotenv import load_dotenv
+@lru_cache(maxsize=1)
+def _load_dotenv_once() -> None:
+    """Load the .env file if it exists (skipped when SKIP_DOTENV=1)"""
+    if os.getenv('SKIP_DOTENV') == '1':
+        return
+
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        print("[Config] python-dotenv not installed, using environment variables only")
+        return
+
     env_path = Path(__file__).parent.parent.parent / '.env'
     if env_path.exists():
         load_dotenv(env_path)
         print(f"[Config] Loaded environment from: {env_path}")
     else:
         print(f"[Config] No .env file found at: {env_path}")
-except ImportError:
-    print("[Config] python-dotenv not installed, using environment variables only")
+
+
+# Accepted LLM server URL schemes and MCP transport types (checked in validate)
+_URL_SCHEMES = ('http://', 'https://')
+_VALID_TRANSPORTS = frozenset({'stdio', 'sse', 'http'})
+
+# Default ADS assistant prompt (used when AGENT_SYSTEM_MESSAGE is not set)
+_DEFAULT_SYSTEM_MESSAGE = '''你是ADS电路设计助手。用自然语言与用户对话，直接执行任务。
+
+## 核心规则
+1. **自己执行，不要让用户执行**：当用户请求时，直接调用工具完成任务
+2. **用自然语言回复**：不要在回复中提到工具名称或返回JSON
+3. **遵循工作流状态**：每个工具返回都会告诉你当前状态和可用工具，严格遵循
+4. **绝对不要虚构参数**：plan_id 必须从 plan_circuit 返回中获取，不能编造
+5. **检查工具返回的 has_plan 字段**：如果为 False，必须用 add_component
+
+## 工作流状态机
+
+状态 IDLE → 可用：get_project_structure, plan_circuit, open_existing_design
+状态 PLAN_CREATED → 需调用 execute_circuit_plan 创建原理图
+状态 WAITING_USER → 需调用 confirm_design_open 确认用户打开了设计
+状态 COMPONENT_ADDING → 可用：add_component, add_wire, save_current_design
+
+## 设计新电路的完整流程
+
+1. 调用 get_project_structure 获取库名
+2. 调用 plan_circuit → 返回 plan_id
+3. 调用 execute_circuit_plan(plan_id)
+4. 告诉用户在ADS中打开原理图
+5. 用户确认后，调用 confirm_design_open
+6. 调用 add_components_from_plan
+
+## 在现有设计中添加元件（严格遵循！）
+
+当用户说"在xxx原理图中添加元件"时：
+1. 调用 get_project_structure 获取库名
+2. 调用 open_existing_design(library_name, cell_name)
+3. **必须使用 add_component**（不要用 add_components_from_plan！）
+   - add_component 需要参数：design_uri, component_type, instance_name, x, y
+   - 例如: add_component("MyLib:test:schematic", "R", "R1", 0, 0)
+
+## 计算元件值
+
+RC低通滤波器：fc = 1 / (2π × R × C)
+例如 fc = 2kHz：R = 7960Ω, C = 10nF
+
+## 回复示例
+
+❌ 错误：虚构 plan_id 如 "plan_12345"
+✅ 正确：使用工具返回的真实数据
+'''
 
 
 class LLMConfig(BaseModel):
@@ -22,6 +82,7 @@ class LLMConfig(BaseModel):
     model_server: str = Field(default="http://127.0.0.1:1234/v1", description="Model server URL")
     api_key: str = Field(default="EMPTY", description="API key for authentication")
     temperature: float = Field(default=0.3, description="Generation temperature")  # Increased from 0.01
+    prompt_cache_key_enabled: bool = Field(default=False, description="Send a per-session prompt_cache_key so the server can reuse its prefix cache")
 
 
 
@@ -33,6 +94,13 @@ class AgentConfig(BaseModel):
         default="你是一个太赫兹实验助手。收到操作指令时，可以调用激光控制工具或网络搜索工具获取信息。重要提示：每个问题最多只搜索一次，如果搜索无结果，请基于已有知识回答，不要重复搜索。使用英文关键词搜索效果更好。",
         description="System message for the agent"
     )
+    max_history_messages: int = Field(default=40, description="Maximum history messages sent to the LLM per request")
+    max_turns: int = Field(default=10, description="Maximum LLM turns per agent run")
+    history_summary_enabled: bool = Field(default=True, description="Summarize old session history instead of dropping it")
+    history_keep_recent: int = Field(default=16, description="Recent messages kept verbatim when session history is summarized")
+    response_cache_size: int = Field(default=128, description="Cached stateless responses (0 disables the cache)")
+    response_cache_ttl: float = Field(default=300.0, description="Response cache entry lifetime in seconds")
+    fast_path_enabled: bool = Field(default=True, description="Run unambiguous tool commands directly, without an LLM call")
 
 
 class WebConfig(BaseModel):
@@ -48,6 +116,7 @@ class MCPServerConfig(BaseModel):
     command: Optional[str] = Field(default=None, description="Command to start the server (for stdio)")
     args: Optional[List[str]] = Field(default=None, description="Arguments for the command (for stdio)")
     url: Optional[str] = Field(default=None, description="URL for the server (for sse or http)")
+    no_share: bool = Field(default=False, description="Always start a dedicated process, even if another server has the same launch config")
 
     class Config:
         # Allow extra fields for flexibility
@@ -78,8 +147,9 @@ class Config(BaseModel):
     @classmethod
     def from_env(cls) -> 'Config':
         """Load configuration from environment variables"""
+        _load_dotenv_once()
+
         # Load MCP servers from environment - allowing JSON format
-        import json
         mcp_servers_json = os.getenv('MCP_SERVERS', '[]')
         mcp_servers = []
         try:
@@ -91,74 +161,38 @@ class Config(BaseModel):
             # If JSON parsing fails, continue with empty list
             pass
 
-        return cls(
-            llm=LLMConfig(
+        # Values below are already coerced by int()/float()/== 'true', so the
+        # models are built without re-validation; validate() checks semantics.
+        # MCP servers come from free-form JSON and stay fully validated above.
+        return cls.model_construct(
+            llm=LLMConfig.model_construct(
                 model=os.getenv('LLM_MODEL', 'qwen3-8b-finetuned'),
                 model_server=os.getenv('LLM_MODEL_SERVER', 'http://127.0.0.1:1234/v1'),
                 api_key=os.getenv('LLM_API_KEY', 'EMPTY'),
-                temperature=float(os.getenv('LLM_TEMPERATURE', '0.01'))
+                temperature=float(os.getenv('LLM_TEMPERATURE', '0.01')),
+                prompt_cache_key_enabled=os.getenv('LLM_PROMPT_CACHE_KEY', 'false').lower() == 'true'
             ),
-            agent=AgentConfig(
+            agent=AgentConfig.model_construct(
                 name=os.getenv('AGENT_NAME', 'THz_Operator'),
                 description=os.getenv('AGENT_DESCRIPTION', '实验操作员'),
-                system_message=os.getenv(
-                    'AGENT_SYSTEM_MESSAGE',
-                    '''你是ADS电路设计助手。用自然语言与用户对话，直接执行任务。
-
-## 核心规则
-1. **自己执行，不要让用户执行**：当用户请求时，直接调用工具完成任务
-2. **用自然语言回复**：不要在回复中提到工具名称或返回JSON
-3. **遵循工作流状态**：每个工具返回都会告诉你当前状态和可用工具，严格遵循
-4. **绝对不要虚构参数**：plan_id 必须从 plan_circuit 返回中获取，不能编造
-5. **检查工具返回的 has_plan 字段**：如果为 False，必须用 add_component
-
-## 工作流状态机
-
-状态 IDLE → 可用：get_project_structure, plan_circuit, open_existing_design
-状态 PLAN_CREATED → 需调用 execute_circuit_plan 创建原理图
-状态 WAITING_USER → 需调用 confirm_design_open 确认用户打开了设计
-状态 COMPONENT_ADDING → 可用：add_component, add_wire, save_current_design
-
-## 设计新电路的完整流程
-
-1. 调用 get_project_structure 获取库名
-2. 调用 plan_circuit → 返回 plan_id
-3. 调用 execute_circuit_plan(plan_id)
-4. 告诉用户在ADS中打开原理图
-5. 用户确认后，调用 confirm_design_open
-6. 调用 add_components_from_plan
-
-## 在现有设计中添加元件（严格遵循！）
-
-当用户说"在xxx原理图中添加元件"时：
-1. 调用 get_project_structure 获取库名
-2. 调用 open_existing_design(library_name, cell_name)
-3. **必须使用 add_component**（不要用 add_components_from_plan！）
-   - add_component 需要参数：design_uri, component_type, instance_name, x, y
-   - 例如: add_component("MyLib:test:schematic", "R", "R1", 0, 0)
-
-## 计算元件值
-
-RC低通滤波器：fc = 1 / (2π × R × C)
-例如 fc = 2kHz：R = 7960Ω, C = 10nF
-
-## 回复示例
-
-❌ 错误：虚构 plan_id 如 "plan_12345"
-✅ 正确：使用工具返回的真实数据
-'''
-                )
-
+                system_message=os.getenv('AGENT_SYSTEM_MESSAGE', _DEFAULT_SYSTEM_MESSAGE),
+                max_history_messages=int(os.getenv('AGENT_MAX_HISTORY_MESSAGES', '40')),
+                max_turns=int(os.getenv('AGENT_MAX_TURNS', '10')),
+                history_summary_enabled=os.getenv('AGENT_HISTORY_SUMMARY_ENABLED', 'true').lower() == 'true',
+                history_keep_recent=int(os.getenv('AGENT_HISTORY_KEEP_RECENT', '16')),
+                response_cache_size=int(os.getenv('AGENT_RESPONSE_CACHE_SIZE', '128')),
+                response_cache_ttl=float(os.getenv('AGENT_RESPONSE_CACHE_TTL', '300')),
+                fast_path_enabled=os.getenv('AGENT_FAST_PATH_ENABLED', 'true').lower() == 'true'
             ),
-            web=WebConfig(
+            web=WebConfig.model_construct(
                 search_enabled=os.getenv('WEB_SEARCH_ENABLED', 'true').lower() == 'true',
                 max_results=int(os.getenv('MAX_SEARCH_RESULTS', '5'))
             ),
-            mcp=MCPConfig(
+            mcp=MCPConfig.model_construct(
                 enabled=os.getenv('MCP_ENABLED', 'true').lower() == 'true',
                 servers=mcp_servers
             ),
-            server=ServerConfig(
+            server=ServerConfig.model_construct(
                 host=os.getenv('SERVER_HOST', '0.0.0.0'),
                 port=int(os.getenv('SERVER_PORT', '8000')),
                 debug=os.getenv('DEBUG', 'false').lower() == 'true'
@@ -167,12 +201,24 @@ RC低通滤波器：fc = 1 / (2π × R × C)
 
     def validate(self):
         """Validate configuration values"""
-        if not self.llm.model_server.startswith(('http://', 'https://')):
+        if not self.llm.model_server.startswith(_URL_SCHEMES):
             raise ValueError("LLM model server URL must start with http:// or https://")
 
         if self.llm.temperature < 0 or self.llm.temperature > 1:
             raise ValueError("Temperature must be between 0 and 1")
 
+        if self.agent.max_history_messages <= 0:
+            raise ValueError("Max history messages must be positive")
+
+        if self.agent.max_turns <= 0:
+            raise ValueError("Max agent turns must be positive")
+
+        if not 0 < self.agent.history_keep_recent < self.agent.max_history_messages:
+            raise ValueError("History keep-recent count must be positive and below max history messages")
+
+        if self.agent.response_cache_size < 0 or self.agent.response_cache_ttl <= 0:
+            raise ValueError("Response cache size must be non-negative and TTL positive")
+
         if self.web.max_results <= 0:
             raise ValueError("Max search results must be positive")
 
@@ -181,7 +227,7 @@ RC低通滤波器：fc = 1 / (2π × R × C)
             for server in self.mcp.servers:
                 if not server.name:
                     raise ValueError("MCP server name is required")
-                if server.transport_type not in ['stdio', 'sse', 'http']:
+                if server.transport_type not in _VALID_TRANSPORTS:
                     raise ValueError(f"Invalid MCP transport type: {server.transport_type}")
                 if server.transport_type == 'stdio' and not server.command:
                     raise ValueError(f"MCP server {server.name} requires a command for stdio transport")
@@ -189,6 +235,13 @@ RC低通滤波器：fc = 1 / (2π × R × C)
                     raise ValueError(f"MCP server {server.name} requires a URL for {server.transport_type} transport")
 
 
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Get the process-wide configuration (loaded and validated once)"""
+    loaded = Config.from_env()
+    loaded.validate()
+    return loaded
+
+
 # Global config instance
-config = Config.from_env()
-config.validate()
\ No newline at end of file
+config = get_config()
\ No newline at end of file
@@ -7,24 +7,41 @@ Provides REST endpoints for:
 3. Session management
 4. Tool listing
 """
-from fastapi import FastAPI, HTTPException, Depends
+import json
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 
 from app.config.settings import config
 from app.agents.services.agent_service import get_agent_service
 from app.agents.services.session_manager import get_session_manager
+from app.api.middleware.compression import init_compression
+from app.api.models import ChatRequest
 
+# Process-wide singletons, bound once instead of looked up per request
+agent_service = get_agent_service()
+session_manager = get_session_manager()
 
-# ==================== Pydantic Models ====================
+# NDJSON stream events are encoded with orjson when it is installed
+try:
+    import orjson
 
-class ChatRequest(BaseModel):
-    """Legacy chat request (stateless)."""
-    message: str
-    history: Optional[List[Dict[str, Any]]] = []
+    def _ndjson_line(event: Dict[str, Any]) -> bytes:
+        return orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _ndjson_line(event: Dict[str, Any]) -> bytes:
+        return (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
 
 
+# ==================== Pydantic Models ====================
+
 class SessionChatRequest(BaseModel):
     """Session-based chat request."""
     message: str
@@ -77,11 +94,43 @@ class IndexResponse(BaseModel):
 
 # ==================== FastAPI App ====================
 
+class ErrorDetailRoute(APIRoute):
+    """
+    Route that turns unexpected handler errors into HTTP 500 responses.
+    
+    Replaces per-endpoint try/except blocks. The error is raised as an
+    HTTPException so the response still passes through the CORS middleware
+    (a global Exception handler runs outside it).
+    """
+    
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        
+        async def route_handler(request: Request) -> Response:
+            try:
+                return await handler(request)
+            except (StarletteHTTPException, RequestValidationError):
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f'An error occurred: {str(e)}')
+        
+        return route_handler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the agent (LLM client, tools, MCP servers) before serving."""
+    await agent_service.initialize()
+    yield
+
+
 app = FastAPI(
     title="THz Agent API",
     version="2.0.0",
-    description="AI Agent with session-based state management"
+    description="AI Agent with session-based state management",
+    lifespan=lifespan
 )
+app.router.route_class = ErrorDetailRoute
 
 # Add CORS middleware
 app.add_middleware(
@@ -92,6 +141,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Gzip JSON responses (e.g. the tool catalog); NDJSON streams stay uncompressed
+init_compression(app)
+
 
 # ==================== Session-Based Chat (Recommended) ====================
 
@@ -105,37 +157,52 @@ async def chat_with_session(request: SessionChatRequest):
     
     Session maintains conversation history automatically.
     """
-    try:
-        agent_service = get_agent_service()
-        session_manager = get_session_manager()
-        
-        # Get or create session
-        if request.session_id:
-            session = session_manager.get_session(request.session_id)
-            if not session:
-                # Session expired or not found, create new one
-                session = session_manager.create_session()
-        else:
+    # Get or create session
+    if request.session_id:
+        session = session_manager.get_session(request.session_id)
+        if not session:
+            # Session expired or not found, create new one
             session = session_manager.create_session()
-        
-        # Process message with session
-        result = await agent_service.chat_with_session(
+    else:
+        session = session_manager.create_session()
+    
+    # Process message with session
+    result = await agent_service.chat_with_session(
+        session_id=session.session_id,
+        message=request.message
+    )
+    
+    return ChatResponse(
+        success=True,
+        response=result["response"],
+        message=request.message,
+        thoughts=result.get("thoughts", []),
+        session_id=result.get("session_id", session.session_id)
+    )
+
+
+@app.post("/api/v1/chat/stream")
+async def chat_with_session_stream(request: SessionChatRequest):
+    """
+    Streaming variant of /api/v1/chat.
+    
+    Returns newline-delimited JSON events: {"type": "delta", "content": ...}
+    for each generated fragment, then a final {"type": "done", ...} event
+    with the full response, thoughts and session_id.
+    """
+    # Get or create session
+    session = session_manager.get_session(request.session_id) if request.session_id else None
+    if not session:
+        session = session_manager.create_session()
+    
+    async def event_stream():
+        async for event in agent_service.stream_with_session(
             session_id=session.session_id,
             message=request.message
-        )
-        
-        return ChatResponse(
-            success=True,
-            response=result["response"],
-            message=request.message,
-            thoughts=result.get("thoughts", []),
-            session_id=result.get("session_id", session.session_id)
-        )
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f'An error occurred: {str(e)}')
+        ):
+            yield _ndjson_line(event)
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
 
 
 # ==================== Session Management ====================
@@ -143,95 +210,70 @@ async def chat_with_session(request: SessionChatRequest):
 @app.post("/api/v1/sessions/create", response_model=SessionResponse)
 async def create_session():
     """Create a new conversation session."""
-    try:
-        session_manager = get_session_manager()
-        session = session_manager.create_session()
-        
-        return SessionResponse(
-            success=True,
-            session_id=session.session_id,
-            message_count=0,
-            created_at=session.to_dict()["created_at"],
-            last_activity=session.to_dict()["last_activity"]
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f'An error occurred: {str(e)}')
+    session = session_manager.create_session()
+    info = session.to_dict()
+    
+    return SessionResponse(
+        success=True,
+        session_id=session.session_id,
+        message_count=0,
+        created_at=info["created_at"],
+        last_activity=info["last_activity"]
+    )
 
 
 @app.get("/api/v1/sessions/{session_id}", response_model=SessionResponse)
 async def get_session_info(session_id: str):
     """Get information about a specific session."""
-    try:
-        session_manager = get_session_manager()
-        session = session_manager.get_session(session_id)
-        
-        if not session:
-            raise HTTPException(status_code=404, detail=f'Session {session_id} not found or expired')
-        
-        info = session.to_dict()
-        return SessionResponse(
-            success=True,
-            session_id=session.session_id,
-            message_count=info["message_count"],
-            created_at=info["created_at"],
-            last_activity=info["last_activity"]
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f'An error occurred: {str(e)}')
+    session = session_manager.get_session(session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail=f'Session {session_id} not found or expired')
+    
+    info = session.to_dict()
+    return SessionResponse(
+        success=True,
+        session_id=session.session_id,
+        message_count=info["message_count"],
+        created_at=info["created_at"],
+        last_activity=info["last_activity"]
+    )
 
 
 @app.delete("/api/v1/sessions/{session_id}")
 async def delete_session(session_id: str):
     """Delete a session and its history."""
-    try:
-        session_manager = get_session_manager()
-        deleted = session_manager.delete_session(session_id)
-        
-        if not deleted:
-            raise HTTPException(status_code=404, detail=f'Session {session_id} not found')
-        
-        return {"success": True, "message": f"Session {session_id} deleted"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f'An error occurred: {str(e)}')
+    deleted = session_manager.delete_session(session_id)
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f'Session {session_id} not found')
+    
+    return {"success": True, "message": f"Session {session_id} deleted"}
 
 
 @app.post("/api/v1/sessions/{session_id}/clear")
 async def clear_session_history(session_id: str):
     """Clear a session's message history but keep the session."""
-    try:
-        session_manager = get_session_manager()
-        session = session_manager.get_session(session_id)
-        
-        if not session:
-            raise HTTPException(status_code=404, detail=f'Session {session_id} not found or expired')
-        
-        session.clear_messages()
-        
-        return {"success": True, "message": f"Session {session_id} history cleared"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f'An error occurred: {str(e)}')
+    session = session_manager.get_session(session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail=f'Session {session_id} not found or expired')
+    
+    session.clear_messages()
+    
+    return {"success": True, "message": f"Session {session_id} history cleared"}
 
 
 @app.get("/api/v1/sessions", response_model=SessionListResponse)
 async def list_sessions():
     """List all active sessions."""
-    try:
-        session_manager = get_session_manager()
-        sessions = session_manager.list_sessions()
-        
-        return SessionListResponse(
-            success=True,
-            sessions=sessions,
-            count=len(sessions)
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f'An error occurred: {str(e)}')
+    sessions = session_manager.list_sessions()
+    
+    return SessionListResponse(
+        success=True,
+        sessions=sessions,
+        count=len(sessions)
+    )
 
 
 # ==================== Legacy API (Stateless) ====================
@@ -243,42 +285,48 @@ async def chat_legacy(request: ChatRequest):
     
     DEPRECATED: Use /api/v1/chat with session_id for persistent conversations.
     """
-    try:
-        if request.history:
-            for msg in request.history:
-                if not isinstance(msg, dict) or 'role' not in msg or 'content' not in msg:
-                    raise HTTPException(
-                        status_code=400,
-                        detail='Each message in history must have role and content fields'
-                    )
-
-        agent_service = get_agent_service()
-        result = await agent_service.process_message_async(request.message, request.history)
-        
-        return ChatResponse(
-            success=True,
-            response=result["response"],
-            message=request.message,
-            thoughts=result.get("thoughts", [])
-        )
+    result = await agent_service.process_message_async(request.message, request.history)
+    
+    return ChatResponse(
+        success=True,
+        response=result["response"],
+        message=request.message,
+        thoughts=result.get("thoughts", [])
+    )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f'An error occurred: {str(e)}')
+
+@app.post("/api/v1/agent/chat/stream")
+async def chat_legacy_stream(request: ChatRequest):
+    """
+    Streaming variant of /api/v1/agent/chat (stateless).
+    
+    Emits the same NDJSON events as /api/v1/chat/stream, without session_id.
+    """
+    async def event_stream():
+        async for event in agent_service.stream_message(request.message, request.history):
+            yield _ndjson_line(event)
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
 
 
 # ==================== Tools & Health ====================
 
 @app.get("/api/v1/tools/list", response_model=ToolsResponse)
-async def list_tools():
-    """List available tools."""
-    try:
-        agent_service = get_agent_service()
-        tools = agent_service.get_available_tools()
-        return ToolsResponse(success=True, tools=tools)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f'An error occurred: {str(e)}')
+async def list_tools(request: Request, response: Response):
+    """
+    List available tools.
+    
+    The tool list is fixed after init, so it carries an ETag and a
+    matching If-None-Match gets 304 without serializing the catalog.
+    """
+    tools = await agent_service.get_available_tools_async()
+    etag = agent_service.get_tools_etag()
+    if etag and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, max-age=60"
+    return ToolsResponse(success=True, tools=tools)
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -295,7 +343,9 @@ async def index():
         version="2.0.0",
         endpoints={
             "chat": "/api/v1/chat (session-based, recommended)",
+            "chat_stream": "/api/v1/chat/stream (session-based, NDJSON stream)",
             "chat_legacy": "/api/v1/agent/chat (stateless, deprecated)",
+            "chat_legacy_stream": "/api/v1/agent/chat/stream (stateless, NDJSON stream)",
             "sessions": "/api/v1/sessions",
             "tools": "/api/v1/tools/list",
             "health": "/health"
@@ -307,16 +357,34 @@ async def index():
 
 def main():
     """Main entry point for the application."""
+    import logging
+    import sys
     import uvicorn
 
+    logging.basicConfig(
+        level=logging.DEBUG if config.server.debug else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    # Prefer the libuv-based uvloop event loop when it is installed
+    loop_impl = "asyncio"
+    if sys.platform != "win32":
+        try:
+            import uvloop  # noqa: F401
+            loop_impl = "uvloop"
+        except ImportError:
+            pass
+
     print(f"Starting THz Agent API v2.0 on {config.server.host}:{config.server.port}")
     print("Session-based state management enabled")
+    print(f"Event loop: {loop_impl}")
 
     uvicorn.run(
         app,
         host=config.server.host,
         port=config.server.port,
-        reload=config.server.debug
+        reload=config.server.debug,
+        loop=loop_impl
     )
 
 
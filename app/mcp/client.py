@@ -1,7 +1,9 @@
 """MCP Client Manager for managing connections to MCP servers."""
 import asyncio
+import json
 import os
 import sys
+import threading
 from contextlib import AsyncExitStack
 from typing import Dict, List, Any, Optional
 
@@ -23,24 +25,38 @@ class MCPClientManager:
         self.exit_stack = AsyncExitStack()
         self.sessions: Dict[str, ClientSession] = {}
         self.tools: List[Dict[str, Any]] = []
+        # Tool name -> tool info (first server wins), for O(1) routing in call_tool
+        self._tool_index: Dict[str, Dict[str, Any]] = {}
         self._connected = False
         self._main_loop = None
 
     async def connect_all(self):
         """Connect to all configured MCP servers and discover their tools."""
-        # Capture the main loop where connections are established
-        self._main_loop = asyncio.get_running_loop()
-
         if not MCP_AVAILABLE or not config.mcp.enabled:
             return
 
         if self._connected:
+            # Keep the loop the existing sessions live on
             return
 
+        # Capture the main loop where connections are established
+        self._main_loop = asyncio.get_running_loop()
+
+        # Launch config key -> name of the server already started with it
+        started: Dict[str, str] = {}
+
         for server_config in config.mcp.servers:
             try:
                 print(f"[MCP] Connecting to server: {server_config.name}")
 
+                key = self._server_key(server_config)
+                shared_name = started.get(key)
+                if shared_name is not None and not server_config.no_share:
+                    # Identical launch config: reuse the running process
+                    self.sessions[server_config.name] = self.sessions[shared_name]
+                    print(f"[MCP] {server_config.name} shares the process of {shared_name}")
+                    continue
+
                 if server_config.transport_type == "stdio":
                     # Sets PYTHONPATH to current directory to ensure imports in server scripts work
                     env = os.environ.copy()
@@ -62,18 +78,21 @@ class MCPClientManager:
                     
                     await session.initialize()
                     self.sessions[server_config.name] = session
+                    started.setdefault(key, server_config.name)
 
                     # List tools
                     result = await session.list_tools()
                     
                     for tool in result.tools:
                         # Store minimal info for routing
-                        self.tools.append({
+                        tool_info = {
                             "name": tool.name,
                             "description": tool.description,
                             "input_schema": tool.inputSchema,
                             "server": server_config.name
-                        })
+                        }
+                        self.tools.append(tool_info)
+                        self._tool_index.setdefault(tool.name, tool_info)
                     
                     tool_names = [t.name for t in result.tools]
                     print(f"[MCP] Connected to {server_config.name}. Tools: {tool_names}")
@@ -87,6 +106,16 @@ class MCPClientManager:
 
         self._connected = True
 
+    @staticmethod
+    def _server_key(server_config) -> str:
+        """Key identifying a server launch config (args order matters)."""
+        return json.dumps([
+            server_config.transport_type,
+            server_config.command,
+            server_config.args or [],
+            server_config.url
+        ])
+
     def call_tool_sync(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """
         Call a tool synchronously from a different thread, ensuring execution 
@@ -112,7 +141,7 @@ class MCPClientManager:
 
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a specific tool by name."""
-        target_tool = next((t for t in self.tools if t["name"] == tool_name), None)
+        target_tool = self._tool_index.get(tool_name)
         if not target_tool:
             raise ValueError(f"Tool '{tool_name}' not found")
 
@@ -148,12 +177,16 @@ class MCPClientManager:
         await self.exit_stack.aclose()
 
 
-# Global MCP client manager instance
+# Global MCP client manager instance, shared by every agent/session so
+# each configured server process is started only once
 _mcp_client_manager = None
+_mcp_client_manager_lock = threading.Lock()
 
 def get_mcp_client_manager():
-    """Get the MCP client manager instance."""
+    """Get the MCP client manager instance (thread-safe)."""
     global _mcp_client_manager
     if _mcp_client_manager is None:
-        _mcp_client_manager = MCPClientManager()
+        with _mcp_client_manager_lock:
+            if _mcp_client_manager is None:
+                _mcp_client_manager = MCPClientManager()
     return _mcp_client_manager
\ No newline at end of file
@@ -22,6 +22,8 @@ class ToolRegistry:
         """Initialize the tool registry."""
         self._tool_classes: Dict[str, Type[BaseTool]] = {}
         self._tool_instances: Dict[str, BaseTool] = {}
+        # Bumped on every registration change (lets callers cache derived data)
+        self.version = 0
 
     def register_class(self, tool_class: Type[BaseTool]) -> Type[BaseTool]:
         """
@@ -38,6 +40,7 @@ class ToolRegistry:
             raise ValueError(f"Tool class {tool_class.__name__} must have a 'name' attribute")
 
         self._tool_classes[tool_class.name] = tool_class
+        self.version += 1
         return tool_class
 
     def register_instance(self, tool: BaseTool) -> BaseTool:
@@ -55,6 +58,7 @@ class ToolRegistry:
             raise ValueError("Tool instance must have a 'name' attribute")
 
         self._tool_instances[tool.name] = tool
+        self.version += 1
         return tool
 
     def register_tools(self, tools: List[BaseTool]) -> None:
@@ -92,6 +96,18 @@ class ToolRegistry:
         
         return None
 
+    def has_tool(self, name: str) -> bool:
+        """
+        Check whether a tool is registered (class or instance).
+        
+        Args:
+            name: Tool name
+            
+        Returns:
+            True if the tool is registered
+        """
+        return name in self._tool_instances or name in self._tool_classes
+
     def list_tools(self) -> List[BaseTool]:
         """
         Get all registered tool instances.
@@ -170,6 +186,7 @@ class ToolRegistry:
         """Clear all registered tools."""
         self._tool_classes.clear()
         self._tool_instances.clear()
+        self.version += 1
 
 
 # Global tool registry instance
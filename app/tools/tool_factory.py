@@ -21,50 +21,75 @@ async def initialize_tools_async() -> List[BaseTool]:
     1. Built-in tools (web search, laser control, etc.)
     2. MCP tools (ADS, etc.) if enabled
     
+    Built-in tools are constructed in a worker thread so their setup
+    overlaps the MCP server connection handshakes.
+    
     Returns:
         List of all initialized tool instances
     """
+    import asyncio
+
     # Clear any existing registrations
     registry.clear()
     
-    # 1. Register built-in tools
-    from app.tools.mock_laser_control import MockLaserControl
-    from app.tools.web_search_tool import WebSearchTool
-
-    # Create and register instances
-    if config.web.search_enabled:
-        try:
-            web_search = WebSearchTool()
-            registry.register_instance(web_search)
-            print(f"[ToolFactory] Registered: {web_search.name}")
-        except Exception as e:
-            print(f"[ToolFactory] Failed to init WebSearchTool: {e}")
+    # 1. Start building built-in tools off the event loop
+    loop = asyncio.get_running_loop()
+    builtin_future = loop.run_in_executor(None, _create_builtin_tools)
 
-    try:
-        laser_control = MockLaserControl()
-        registry.register_instance(laser_control)
-        print(f"[ToolFactory] Registered: {laser_control.name}")
-    except Exception as e:
-        print(f"[ToolFactory] Failed to init MockLaserControl: {e}")
-
-    # 2. Load MCP tools if enabled
+    # 2. Meanwhile, load MCP tools if enabled
+    mcp_tools: List[BaseTool] = []
     if config.mcp.enabled:
         try:
-            await load_mcp_tools()
+            mcp_tools = await load_mcp_tools()
         except Exception as e:
             print(f"[ToolFactory] Failed to load MCP tools: {e}")
             import traceback
             traceback.print_exc()
 
+    # Register built-ins first so MCP tools keep precedence on name clashes
+    for tool in await builtin_future:
+        registry.register_instance(tool)
+        print(f"[ToolFactory] Registered: {tool.name}")
+    registry.register_tools(mcp_tools)
+
     all_tools = registry.list_tools()
     print(f"[ToolFactory] Total tools registered: {len(all_tools)}")
     
     return all_tools
 
 
-async def load_mcp_tools() -> None:
+def _create_builtin_tools() -> List[BaseTool]:
+    """
+    Instantiate the built-in tools.
+    
+    Returns:
+        List of built-in tool instances that initialized successfully
+    """
+    from app.tools.mock_laser_control import MockLaserControl
+    from app.tools.web_search_tool import WebSearchTool
+
+    tools: List[BaseTool] = []
+
+    if config.web.search_enabled:
+        try:
+            tools.append(WebSearchTool())
+        except Exception as e:
+            print(f"[ToolFactory] Failed to init WebSearchTool: {e}")
+
+    try:
+        tools.append(MockLaserControl())
+    except Exception as e:
+        print(f"[ToolFactory] Failed to init MockLaserControl: {e}")
+
+    return tools
+
+
+async def load_mcp_tools() -> List[BaseTool]:
     """
-    Load tools from MCP servers and register them.
+    Connect to MCP servers and create proxy tools for their tools.
+    
+    Returns:
+        List of MCP proxy tools (not yet registered)
     """
     from app.mcp.client import get_mcp_client_manager
     from app.tools.mcp_converter import create_mcp_proxy_tools
@@ -79,12 +104,11 @@ async def load_mcp_tools() -> None:
     mcp_defs = mcp_manager.get_all_tools_definitions()
     print(f"[ToolFactory] Found {len(mcp_defs)} MCP tools")
     
-    if mcp_defs:
-        # Create proxy tools
-        proxy_tools = create_mcp_proxy_tools(mcp_defs, mcp_manager)
-        
-        # Register with global registry
-        registry.register_tools(proxy_tools)
+    if not mcp_defs:
+        return []
+
+    # Create proxy tools
+    return create_mcp_proxy_tools(mcp_defs, mcp_manager)
 
 
 def initialize_tools() -> List[BaseTool]:
@@ -0,0 +1,109 @@
+"""
+Concurrency tests for AgentService request coalescing.
+
+Run with pytest, or directly: python tests/test_agent_service_concurrency.py
+"""
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.agents.services.agent_service import AgentService
+
+
+def _make_service(release: asyncio.Event, completed: bool = True) -> AgentService:
+    """Initialized service whose agent loop answers once release is set"""
+    service = AgentService()
+    service._initialized = True
+    service._client = object()
+    service.runs = 0
+
+    async def run_agent_loop(message, history=None, on_delta=None, max_turns=None):
+        service.runs += 1
+        await release.wait()
+        thoughts = [{"role": "assistant", "content": f"answer to {message}", "tool_calls": None}]
+        return {"response": f"answer to {message}", "thoughts": thoughts, "completed": completed}
+
+    service._run_agent_loop = run_agent_loop
+    return service
+
+
+class InflightCoalescingTest(unittest.TestCase):
+
+    def test_cancelled_follower_does_not_affect_others(self):
+        async def scenario():
+            release = asyncio.Event()
+            service = _make_service(release)
+
+            leader = asyncio.create_task(service.process_message_async("hi"))
+            await asyncio.sleep(0)
+            followers = [
+                asyncio.create_task(service.process_message_async("hi"))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+
+            followers[0].cancel()
+            await asyncio.sleep(0)
+            release.set()
+
+            results = await asyncio.gather(leader, *followers, return_exceptions=True)
+            return service, results
+
+        service, (leader, cancelled, follower) = asyncio.run(scenario())
+
+        self.assertIsInstance(cancelled, asyncio.CancelledError)
+        self.assertEqual(leader["response"], "answer to hi")
+        self.assertEqual(follower["response"], "answer to hi")
+        self.assertEqual(service.runs, 1)
+        self.assertEqual(service._inflight, {})
+
+    def test_mutating_a_result_does_not_touch_the_cache(self):
+        async def scenario():
+            release = asyncio.Event()
+            release.set()
+            service = _make_service(release)
+
+            first = await service.process_message_async("hi")
+            first["thoughts"][0]["content"] = "changed"
+            first["thoughts"].append({"role": "user"})
+
+            second = await service.process_message_async("hi")
+            second["thoughts"].clear()
+
+            third = await service.process_message_async("hi")
+            return service, third
+
+        service, third = asyncio.run(scenario())
+
+        self.assertEqual(service.runs, 1)
+        self.assertEqual(
+            third["thoughts"],
+            [{"role": "assistant", "content": "answer to hi", "tool_calls": None}]
+        )
+
+    def test_incomplete_result_is_not_shared_or_cached(self):
+        async def scenario():
+            release = asyncio.Event()
+            service = _make_service(release, completed=False)
+
+            leader = asyncio.create_task(service.process_message_async("hi"))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(service.process_message_async("hi"))
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(leader, follower)
+
+            await service.process_message_async("hi")
+            return service
+
+        service = asyncio.run(scenario())
+
+        self.assertEqual(service.runs, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()